@@ -0,0 +1,167 @@
+import numpy as np
+from scoring import top_k_indices
+from mapped_arrays import MappedArrays
+
+ANN_INDEX_FILE = "database/ann_index.json"
+
+
+class IVFIndex:
+    """Inverted-file index for approximate maximum inner product search.
+
+    Vectors are grouped under spherical k-means centroids. A query scores the
+    centroids, probes the nprobe best lists and scores only their members
+    exactly. Until min_train_size vectors have been added every search is
+    brute force. Row i of the index is candidate i of the store.
+
+    With a path, the vectors, list assignments and centroids are
+    MappedArrays files shared by every worker, and adding or updating a row
+    writes only that row. Without a path the arrays are kept in memory.
+    """
+
+    def __init__(self, path=ANN_INDEX_FILE, nprobe=16, min_train_size=1024):
+        self.path = path
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self.arrays = MappedArrays(path) if path else None
+        self.reset()
+        self.load()
+
+    def __len__(self):
+        return self.rows
+
+    def reset(self):
+        self.rows = 0
+        self.dim = None
+        self.vectors = None
+        self.centroids = None
+        self.assignments = None
+        self.trained_size = 0
+        self._lists = None
+
+    def load(self):
+        if not self.path:
+            return
+        try:
+            header = self.arrays.read_header()
+            if header is None:
+                return
+            self.rows, self.dim = int(header["rows"]), header["dim"]
+            self.trained_size = int(header["trained_size"])
+            self._map(header["lists"])
+        except Exception as e:
+            print("⚠ ANN index unreadable, rebuilding:", e)
+            self.reset()
+
+    def _map(self, lists):
+        self._lists = None
+        if self.rows == 0:
+            self.vectors = self.centroids = self.assignments = None
+            return
+        self._map_vectors(self.rows)
+        self.centroids = self.assignments = None
+        if lists:
+            self.centroids = self.arrays.map("centroids", np.float32, (lists, self.dim))
+            self.assignments = self.arrays.map("assign", np.int32, (self.rows,))
+
+    def _map_vectors(self, rows):
+        if self.path:
+            self.vectors = self.arrays.map("f32", np.float32, (rows, self.dim))
+
+    def refresh(self):
+        if self.path and self.arrays.changed():
+            self.reset()
+            self.load()
+
+    def save(self):
+        self._lists = None
+        if not self.path or self.rows == 0:
+            return
+        lists = 0 if self.centroids is None else len(self.centroids)
+        self.arrays.publish({"rows": self.rows, "dim": self.dim, "trained_size": self.trained_size, "lists": lists})
+        self._map(lists)
+
+    def _write(self, kind, start, values):
+        """Write rows of the vectors ("f32") or assignments ("assign") array from start on."""
+        if not self.path:
+            name = "vectors" if kind == "f32" else "assignments"
+            current = getattr(self, name)
+            if current is None or start == 0 and len(values) >= len(current):
+                setattr(self, name, np.array(values))
+            elif start == len(current):
+                setattr(self, name, np.concatenate([current, values]))
+            else:
+                current[start:start + len(values)] = values
+            return
+        self.arrays.write_rows(kind, start, values, self.rows)
+
+    def add(self, vectors):
+        """Append vectors, retraining the coarse quantizer whenever the index doubles."""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if len(vectors) == 0:
+            return
+        start = self.rows
+        self.dim = self.dim or vectors.shape[1]
+        self._write("f32", start, vectors)
+        self._map_vectors(start + len(vectors))
+        if start + len(vectors) >= max(self.min_train_size, 2 * self.trained_size):
+            self.train()
+        elif self.centroids is not None:
+            self._write("assign", start, self._assign(vectors))
+        self.rows = start + len(vectors)
+        self.save()
+
+    def update(self, row, vector):
+        """Replace the vector stored at row, moving it to its new list if needed."""
+        vector = np.asarray(vector, dtype=np.float32).reshape(1, -1)
+        self._write("f32", row, vector)
+        if self.centroids is not None:
+            self._write("assign", row, self._assign(vector))
+        self.save()
+
+    def train(self, iterations=10, seed=0):
+        n = len(self.vectors)
+        nlist = max(1, int(np.sqrt(n)))
+        rng = np.random.default_rng(seed)
+        sample = _normalize(self.vectors[rng.choice(n, size=min(n, 64 * nlist), replace=False)])
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            filled = np.bincount(labels, minlength=nlist) > 0
+            centroids[filled] = _normalize(sums[filled])
+        self.centroids = centroids
+        self.assignments = self._assign(self.vectors)
+        self.trained_size = n
+        if self.path:
+            self.arrays.replace("centroids", self.centroids)
+            self.arrays.replace("assign", self.assignments)
+
+    def _assign(self, vectors, batch_size=8192):
+        return np.concatenate([np.argmax(_normalize(vectors[i:i + batch_size]) @ self.centroids.T, axis=1)
+                               for i in range(0, len(vectors), batch_size)]).astype(np.int32)
+
+    def _members(self, lists):
+        if self._lists is None:
+            order = np.argsort(self.assignments, kind="stable")
+            bounds = np.searchsorted(self.assignments[order], np.arange(len(self.centroids) + 1))
+            self._lists = (order, bounds)
+        order, bounds = self._lists
+        return np.sort(np.concatenate([order[bounds[i]:bounds[i + 1]] for i in lists]))
+
+    def search(self, query, k=None, nprobe=None):
+        """Ids and scores of the k best vectors, best first; k=None searches exhaustively."""
+        if self.rows == 0:
+            return np.arange(0), np.zeros(0, dtype=np.float32)
+        if self.centroids is None or k is None:
+            candidates = np.arange(len(self))
+        else:
+            candidates = self._members(top_k_indices(self.centroids @ query, nprobe or self.nprobe))
+        scores = self.vectors[candidates] @ query
+        best = top_k_indices(scores, k)
+        return candidates[best], scores[best]
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
@@ -1,45 +1,89 @@
 import os
 import re
 import csv
-import fitz  # PyMuPDF
-import spacy
-import pandas as pd
+import json
+import time
+import numpy as np
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-
+from scoring import KeywordIndex, top_k_indices
+from candidate_cache import CandidateCache, file_signature
+from candidate_store import CandidateStore
+from candidate_filters import FILTER_KEYS, FilterIndex, parse_filters
+from pdf_text import MAX_BYTES, extract_text
+from upload_store import UploadStore, read_upload
+from query_cache import LRUCache, normalize_query, query_key
+from model_registry import ModelRegistry
+import metrics
+from metrics import span
+
+START_TIME = time.perf_counter()
 app = Flask(__name__)
 CORS(app)
+metrics.instrument(app)
 
 UPLOAD_FOLDER = 'uploads'
+# app1 keeps its own columns in its own database; database/candidates.csv is only read, by both apps.
 CSV_FILE = "database/candidates.csv"
+DB_FILE = "database/app1_candidates.db"
+CANDIDATE_COLUMNS = ["Name", "Email", "Phone", "Skills", "Experience", "Degree", "University", "CGPA", "FullText"]
+DETAIL_COLUMNS = CANDIDATE_COLUMNS[:-1]
+DETAIL_KEYS = ["name", "email", "phone", "skills", "experience", "degree", "university", "cgpa"]
+# There is no Certifications column, so there is nothing to filter certifications on.
+MATCH_FILTERS = FILTER_KEYS - {"certifications"}
 ALLOWED_EXTENSIONS = {'pdf'}
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get("MAX_UPLOAD_MB", 64)) * 1024 * 1024
 
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 if not os.path.exists("database"):
     os.makedirs("database")
 
-nlp = spacy.load("en_core_web_sm")
+def load_nlp():
+    import spacy
+    nlp = spacy.load("en_core_web_sm")
+    if "senter" in nlp.disabled:
+        nlp.enable_pipe("senter")
+    return nlp
+
+# Resumes only need entities and sentence boundaries; job descriptions only need POS tags.
+def resume_disabled(nlp):
+    sentence_pipe = "senter" if "senter" in nlp.pipe_names else "parser"
+    return [pipe for pipe in nlp.pipe_names if pipe not in ("tok2vec", "ner", sentence_pipe)]
+
+def job_disabled(nlp):
+    return [pipe for pipe in nlp.pipe_names if pipe not in ("tok2vec", "tagger", "attribute_ruler")]
+
+models = ModelRegistry()
+models.register("spacy", load_nlp)
+candidate_cache = CandidateCache()
+upload_store = UploadStore(UPLOAD_FOLDER)
+candidate_store = CandidateStore(DB_FILE, CANDIDATE_COLUMNS)
+job_cache = LRUCache(max_entries=512, ttl=3600)
+result_cache = LRUCache(max_entries=256, ttl=3600)
+metrics.add_cache_collectors({"candidates": candidate_cache, "job_descriptions": job_cache, "results": result_cache})
+metrics.add_model_collector(models)
 
 # ✅ Allowed File Type
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 # ✅ Extract Text from PDF
-def extract_text_from_pdf(pdf_path):
-    text = ""
+def extract_text_from_pdf(source):
     try:
-        with fitz.open(pdf_path) as pdf:
-            for page in pdf:
-                text += page.get_text() + "\n"
+        return extract_text(source)
     except Exception as e:
         print("❌ Error extracting text:", e)
-    return text.strip()
+        return ""
+
+# ✅ Parse Resumes Once (NER + sentence boundaries only)
+def parse_resumes(texts, batch_size=16):
+    nlp = models.get("spacy")
+    return nlp.pipe(texts, disable=resume_disabled(nlp), batch_size=batch_size)
 
 # ✅ Extract Name
-def extract_name(text):
-    doc = nlp(text)
+def extract_name(doc):
     for ent in doc.ents:
         if ent.label_ == "PERSON":
             return ent.text
@@ -55,8 +99,7 @@ def extract_phone(text):
     return match.group(0) if match else "Not Found"
 
 # ✅ Extract Sections Based on Meaning
-def extract_section_data(text, section_keywords):
-    doc = nlp(text)
+def extract_section_data(doc, section_keywords):
     extracted_data = []
     
     for sentence in doc.sents:
@@ -66,23 +109,35 @@ def extract_section_data(text, section_keywords):
 
     return ", ".join(extracted_data) if extracted_data else "Not Found"
 
-# ✅ Save to CSV
-def save_to_csv(name, email, phone, skills, experience, degree, university, cgpa, full_text):
-    """Save extracted resume details to CSV properly formatted."""
-    file_exists = os.path.isfile(CSV_FILE)
-
-    if file_exists:
-        with open(CSV_FILE, 'r', encoding='utf-8') as f:
-            first_line = f.readline().strip()
-        if "Name,Email,Phone,Skills,Experience,Degree,University,CGPA,FullText" not in first_line:
-            print("⚠ CSV file corrupted! Resetting...")
-            file_exists = False
-
-    with open(CSV_FILE, mode='a', newline='', encoding='utf-8') as file:
-        writer = csv.writer(file)
-        if not file_exists:
-            writer.writerow(["Name", "Email", "Phone", "Skills", "Experience", "Degree", "University", "CGPA", "FullText"])
-        writer.writerow([name, email, phone, skills, experience, degree, university, cgpa, full_text.replace("\n", " ")])
+# ✅ Extract All Details from One Parsed Resume
+def extract_resume_details(text, doc):
+    return {
+        'name': extract_name(doc),
+        'email': extract_email(text),
+        'phone': extract_phone(text),
+        'skills': extract_section_data(doc, ["skills", "programming", "technical skills"]),
+        'experience': extract_section_data(doc, ["experience", "internship", "projects", "certifications"]),
+        'degree': extract_section_data(doc, ["bachelor", "master", "phd", "education"]),
+        'university': extract_section_data(doc, ["university", "college", "institute"]),
+        'cgpa': extract_section_data(doc, ["cgpa", "gpa", "percentage"])
+    }
+
+# ✅ Import a CSV written by an earlier app1, if it has app1's columns
+def import_legacy_csv():
+    if not os.path.exists(CSV_FILE):
+        return
+    with open(CSV_FILE, encoding="utf-8", newline="") as f:
+        header = next(csv.reader(f), [])
+    if header == CANDIDATE_COLUMNS:
+        candidate_store.import_csv(CSV_FILE)
+
+import_legacy_csv()
+
+# ✅ Save through the store's single group-committing writer
+def save_candidates(rows):
+    """Append (details, full_text) pairs; returns once they are committed, together with any concurrent uploads."""
+    candidate_store.append_many({**dict(zip(DETAIL_COLUMNS, (details[key] for key in DETAIL_KEYS))),
+                                 "FullText": full_text} for details, full_text in rows)
 
     print("✅ Resume data saved successfully!")
 
@@ -92,37 +147,44 @@ def upload_file():
     if 'file' not in request.files:
         return jsonify({'message': 'No file part'}), 400
 
-    file = request.files['file']
-    if file.filename == '':
+    files = [file for file in request.files.getlist('file') if file.filename != '']
+    if not files:
         return jsonify({'message': 'No selected file'}), 400
 
-    if file and allowed_file(file.filename):
-        filename = file.filename
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-
-        text = extract_text_from_pdf(filepath)
-        name = extract_name(text)
-        email = extract_email(text)
-        phone = extract_phone(text)
-        skills = extract_section_data(text, ["skills", "programming", "technical skills"])
-        experience = extract_section_data(text, ["experience", "internship", "projects", "certifications"])
-        degree = extract_section_data(text, ["bachelor", "master", "phd", "education"])
-        university = extract_section_data(text, ["university", "college", "institute"])
-        cgpa = extract_section_data(text, ["cgpa", "gpa", "percentage"])
-
-        save_to_csv(name, email, phone, skills, experience, degree, university, cgpa, text)
-
-        return jsonify({
-            'message': 'File uploaded successfully!',
-            'name': name, 'email': email, 'phone': phone,
-            'skills': skills, 'experience': experience,
-            'degree': degree, 'university': university, 'cgpa': cgpa
-        }), 200
+    texts = []
+    for file in files:
+        if not allowed_file(file.filename):
+            return jsonify({'message': f'Invalid file type: {file.filename}'}), 400
+        sha256, data = read_upload(file.stream)
+        if len(data) > MAX_BYTES:
+            return jsonify({'message': f'File too large: {file.filename}'}), 413
+        upload_store.persist(sha256, data)
+        texts.append(extract_text_from_pdf(data))
+
+    # Several files under 'file' are parsed together in nlp.pipe batches.
+    with span("spacy_parse"):
+        docs = list(parse_resumes(texts))
+    candidates = []
+    for text, doc in zip(texts, docs):
+        with span("extract_details"):
+            candidates.append(extract_resume_details(text, doc))
+    save_candidates(list(zip(candidates, texts)))
+    result_cache.clear()
+
+    if len(candidates) == 1:
+        return jsonify({'message': 'File uploaded successfully!', **candidates[0]}), 200
+    return jsonify({'message': f'{len(candidates)} files uploaded successfully!', 'candidates': candidates}), 200
+
+# ✅ Job Keywords, Cached per Normalised Description
+def job_keywords(job_description):
+    text = normalize_query(job_description)
+    return job_cache.get(query_key(text), lambda: process_job_description(text))
 
 # ✅ NLP-based Resume Ranking
 def process_job_description(job_description):
-    doc = nlp(job_description.lower())
+    nlp = models.get("spacy")
+    with span("spacy_parse_job"):
+        doc = nlp(job_description.lower(), disable=job_disabled(nlp))
     extracted_skills, qualifications, experience = [], [], 0
 
     for token in doc:
@@ -135,29 +197,40 @@ def process_job_description(job_description):
     print("Extracted Job Keywords:", extracted_skills)
     return extracted_skills, experience, qualifications
 
-# ✅ Rank Resumes Based on Job Description
-def rank_resumes(job_description):
-    if not os.path.exists(CSV_FILE) or os.stat(CSV_FILE).st_size == 0:
-        print("⚠ CSV file is empty or missing!")
-        return []
+# ✅ Load Candidates Once per Store Version (FullText is never read)
+def load_candidates():
+    df = candidate_store.read(DETAIL_COLUMNS)
+    fields = ["Skills", "Experience", "Degree", "University", "CGPA"]
+    keyword_index = KeywordIndex({field: df[field].astype(str).str.lower() for field in fields})
+    filter_index = FilterIndex()
+    filter_index.add(candidate_store.read_facets().to_dict("records"))
+    return df, keyword_index, filter_index
+
+# ✅ Rank Resumes, Cached until the Store Changes
+def rank_resumes(job_description, top_k=None, filters=None):
+    key = (query_key(job_description), file_signature(candidate_store.files()), top_k,
+           json.dumps(filters, sort_keys=True))
+    return result_cache.get(key, lambda: _rank_resumes(job_description, top_k, filters))
 
-    df = pd.read_csv(CSV_FILE)
+def _rank_resumes(job_description, top_k, filters):
+    df, keyword_index, filter_index = candidate_cache.get("candidates", candidate_store.files(), load_candidates)
 
     if df.empty:
-        print("⚠ No data found in CSV file!")
+        print("⚠ No candidates stored yet!")
         return []
 
-    job_keywords, min_experience, qualifications = process_job_description(job_description)
-    ranked_candidates = []
-
-    for i, row in df.iterrows():
-        field_match_score = 0
-        fields = ["Skills", "Experience", "Degree", "University", "CGPA"]  
-        
-        for field in fields:
-            resume_field = str(row[field]).lower()  
-            field_match_score += sum(1 for word in job_keywords if word in resume_field)
+    keywords, min_experience, qualifications = job_keywords(job_description)
+    # Only candidates passing the structured filters are scored.
+    mask = filter_index.mask(filters, len(df))
+    rows = None if mask is None else np.flatnonzero(mask)
+    with span("score"):
+        scores = keyword_index.scores(keywords, rows)
+        order = top_k_indices(scores, top_k)
+    metrics.inc("candidates_scored_total", len(scores), ranker="keyword")
 
+    ranked_candidates = []
+    ids = order if rows is None else rows[order]
+    for score, row in zip(scores[order], df.iloc[ids].to_dict("records")):
         ranked_candidates.append({
             "name": row["Name"],
             "email": row["Email"],
@@ -167,10 +240,9 @@ def rank_resumes(job_description):
             "degree": row["Degree"],
             "university": row["University"],
             "cgpa": row["CGPA"],
-            "score": field_match_score
+            "score": int(score)
         })
 
-    ranked_candidates.sort(key=lambda x: x["score"], reverse=True)
     return ranked_candidates
 
 # ✅ API Route: Match Resumes to Job Description
@@ -180,14 +252,58 @@ def match_resumes():
     if "job_description" not in data:
         return jsonify({"message": "Job description is required"}), 400
 
-    ranked_candidates = rank_resumes(data["job_description"])
-    return jsonify({"message": "Resumes ranked successfully!", "candidates": ranked_candidates}), 200
+    try:
+        top_k = int(data["top_k"]) if data.get("top_k") is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"message": "top_k must be an integer"}), 400
+    if top_k is not None and top_k < 0:
+        return jsonify({"message": "top_k must not be negative"}), 400
+
+    try:
+        filters = parse_filters(data.get("filters"), MATCH_FILTERS)
+    except (TypeError, ValueError) as e:
+        return jsonify({"message": f"Invalid filters: {e}"}), 400
+
+    ranked_candidates = rank_resumes(data["job_description"], top_k, filters)
+    # The experience asked for in the description, for clients to offer as a min_years filter.
+    min_experience = job_keywords(data["job_description"])[1]
+    return jsonify({"message": "Resumes ranked successfully!", "candidates": ranked_candidates,
+                    "min_experience": min_experience}), 200
+
+# ✅ API Route: Candidate Cache Counters
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify({
+        **candidate_cache.stats(),
+        "job_descriptions": job_cache.stats(),
+        "results": result_cache.stats()
+    }), 200
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return metrics.REGISTRY.render(), 200, {"Content-Type": metrics.CONTENT_TYPE}
+
+@app.route('/health', methods=['GET'])
+def health():
+    return jsonify({
+        "status": "ok",
+        "warm": models.is_warm,
+        "models": models.status(),
+        "startup_seconds": STARTUP_SECONDS,
+        "uptime_seconds": round(time.time() - models.created, 1)
+    }), 200
+
+# ✅ Load models before gunicorn forks its workers when PRELOAD_MODELS is set
+models.warm_if_preloading()
+STARTUP_SECONDS = round(time.perf_counter() - START_TIME, 2)
 
 if __name__ == "__main__":
     app.run(debug=True)
 
 
 
+# Earlier single-file frontend, kept for reference.
+'''
 <!--
 <!DOCTYPE html>
 <html lang="en">
@@ -304,3 +420,4 @@ if __name__ == "__main__":
     <div id="matchResult"></div>
 </body>
 </html>
+'''
@@ -0,0 +1,88 @@
+"""Recall and latency of the IVF index against exact ranking.
+
+    python bench_ann.py                      # stored candidates, ground truth from exact weighted scores
+    python bench_ann.py --synthetic 100000   # random vectors, ground truth from exact search
+
+Run from the backend directory. Recall@k is the share of the exact top k
+that the index returns for each nprobe setting.
+"""
+import argparse
+import time
+import numpy as np
+from ann_index import IVFIndex
+from scoring import top_k_indices, weighted_similarity
+
+DEFAULT_QUERIES = [
+    "Python developer with machine learning and SQL experience",
+    "VLSI design engineer with Verilog and Xilinx",
+    "Java full stack developer with cloud certification",
+]
+
+
+def build_index(vectors):
+    index = IVFIndex(path=None, min_train_size=1)
+    index.add(vectors)
+    return index
+
+
+def report(index, queries, exact_rankings, k, nprobes):
+    print(f"{len(index)} candidates, {len(index.centroids)} lists, {len(queries)} queries, k={k}")
+    for nprobe in nprobes:
+        recalls, timings = [], []
+        for query, exact in zip(queries, exact_rankings):
+            start = time.perf_counter()
+            ids, _ = index.search(query, k, nprobe=nprobe)
+            timings.append(time.perf_counter() - start)
+            recalls.append(len(set(ids) & set(exact[:k])) / min(k, len(exact)))
+        print(f"nprobe={nprobe:<4} recall@{k}={np.mean(recalls):.3f}  latency={1000 * np.mean(timings):.2f} ms")
+
+
+def bench_candidates(queries, k, nprobes):
+    import ranker
+
+    ranker.sync_embeddings()
+    index = build_index(ranker.combined_vectors(ranker.embedding_store.stacked))
+
+    query_vectors = ranker.encode_texts(ranker.bert_model(), queries)
+    exact_rankings = []
+    for query in query_vectors:
+        start = time.perf_counter()
+        scores = weighted_similarity(ranker.embedding_store.stacked, ranker.FIELD_WEIGHTS, query)
+        print(f"exact brute force: {1000 * (time.perf_counter() - start):.1f} ms")
+        exact_rankings.append(top_k_indices(scores))
+    report(index, query_vectors, exact_rankings, k, nprobes)
+
+
+def bench_synthetic(size, dim, num_queries, k, nprobes, seed=0):
+    rng = np.random.default_rng(seed)
+    # A few hundred topics plus noise, so the data has the cluster structure real resumes have.
+    topics = rng.standard_normal((256, dim)).astype(np.float32)
+    vectors = topics[rng.integers(0, len(topics), size)] + 1.5 * rng.standard_normal((size, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    start = time.perf_counter()
+    index = build_index(vectors)
+    print(f"index build: {time.perf_counter() - start:.2f} s")
+
+    queries = vectors[rng.integers(0, size, num_queries)] + 0.1 * rng.standard_normal((num_queries, dim)).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    start = time.perf_counter()
+    exact_rankings = [top_k_indices(vectors @ query, k) for query in queries]
+    print(f"exact search: {1000 * (time.perf_counter() - start) / num_queries:.2f} ms/query")
+    report(index, queries, exact_rankings, k, nprobes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--synthetic", type=int, help="benchmark on this many random vectors instead of the stored candidates")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", nargs="*", default=DEFAULT_QUERIES)
+    parser.add_argument("--num-queries", type=int, default=50)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    if args.synthetic:
+        bench_synthetic(args.synthetic, args.dim, args.num_queries, args.k, args.nprobe)
+    else:
+        bench_candidates(args.queries, args.k, args.nprobe)
@@ -0,0 +1,48 @@
+"""Micro-benchmark of resume section extraction: per-keyword line scans vs SECTION_MATCHER.
+
+    python bench_keywords.py [pdf ...] [--repeat N]
+
+Run from the backend directory; defaults to every PDF in uploads/. Prints
+the time per resume for both implementations and any field where they differ.
+"""
+import argparse
+import glob
+import os
+import timeit
+from resume_parser import extract_sections, extract_text_from_pdf
+
+
+def legacy_sections(text):
+    """Section extraction as it was before SECTION_MATCHER."""
+    lines = text.split("\n")
+    education_keywords = ["Bachelor", "Master", "B.Tech", "M.Tech", "BSc", "MSc", "PhD", "university", "college"]
+    experience_keywords = ["experience", "worked at", "internship", "years", "projects"]
+    skills_keywords = ["Python", "Java", "SQL", "HTML", "CSS", "Cloud Computing", "Machine Learning", "Deep Learning", "C++", "Verilog", "Xilinx", "Digital Circuit Design", "Analog Circuit Design"]
+    cert_keywords = ["certification", "certified", "course", "diploma", "Udemy", "NPTEL", "WIPRO"]
+    return {
+        "Education": " | ".join([line for line in lines if any(word in line for word in education_keywords)]),
+        "Experience": " | ".join([line for line in lines if any(word.lower() in line.lower() and len(line.split()) > 3 for word in experience_keywords)]),
+        "Skills": ", ".join(set([word for word in skills_keywords if word in text])),
+        "Certifications": " | ".join([line for line in lines if any(word.lower() in line.lower() for word in cert_keywords)]),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", default=sorted(glob.glob(os.path.join("uploads", "*.pdf"))))
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    texts = [text for text in (extract_text_from_pdf(path) for path in args.pdfs) if text]
+    print(f"{len(texts)} resumes, {sum(len(t) for t in texts)} characters, {args.repeat} repeats")
+
+    for name, fn in [("legacy line scans", legacy_sections), ("SECTION_MATCHER", extract_sections)]:
+        seconds = timeit.timeit(lambda: [fn(text) for text in texts], number=args.repeat)
+        print(f"{name:<18} {1e6 * seconds / (args.repeat * len(texts)):8.1f} µs/resume")
+
+    for path, text in zip(args.pdfs, texts):
+        old, new = legacy_sections(text), extract_sections(text)
+        for field in old:
+            same = set(old[field].split(", ")) == set(new[field].split(", ")) if field == "Skills" else old[field] == new[field]
+            if not same:
+                print(f"⚠ {os.path.basename(path)} {field}: {old[field]!r} -> {new[field]!r}")
@@ -0,0 +1,37 @@
+"""Benchmark of PDF text extraction engines.
+
+    python bench_pdf.py [pdf ...] [--repeat N] [--workers N]
+
+Run from the backend directory; defaults to every PDF in uploads/. Prints
+the time per PDF and the characters extracted by each engine, and with
+--workers the time of page-parallel extraction as well.
+"""
+import argparse
+import glob
+import os
+import timeit
+from pdf_text import MAX_PAGES, available_engines, engine_pages, extract_text
+
+
+def engine_text(engine, path, workers=None):
+    return " \n".join(page for page in engine_pages(engine, path, MAX_PAGES, workers) if page)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", default=sorted(glob.glob(os.path.join("uploads", "*.pdf"))))
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--workers", type=int, help="also time page-parallel extraction with N processes")
+    args = parser.parse_args()
+
+    print(f"{len(args.pdfs)} PDFs, {sum(os.path.getsize(path) for path in args.pdfs)} bytes, {args.repeat} repeats")
+    runs = [(engine, engine, None) for engine in available_engines()]
+    if args.workers:
+        runs += [(f"{engine} x{args.workers}", engine, args.workers) for engine in available_engines()]
+    for label, engine, workers in runs:
+        seconds = timeit.timeit(lambda: [engine_text(engine, path, workers) for path in args.pdfs], number=args.repeat)
+        characters = sum(len(engine_text(engine, path, workers)) for path in args.pdfs)
+        print(f"{label:<16} {1000 * seconds / (args.repeat * len(args.pdfs)):8.2f} ms/PDF  {characters:>8} characters")
+
+    seconds = timeit.timeit(lambda: [extract_text(path) for path in args.pdfs], number=args.repeat)
+    print(f"{'extract_text':<16} {1000 * seconds / (args.repeat * len(args.pdfs)):8.2f} ms/PDF")
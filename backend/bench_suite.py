@@ -0,0 +1,229 @@
+"""Ingest and match benchmarks on a synthetic resume corpus.
+
+    python bench_suite.py [--sizes 1000 10000 100000] [--apps ranker app1]
+                          [--queries 200] [--pdfs 200] [--output bench_results.json]
+
+Run from the backend directory. Every (app, size) pair runs in its own
+process and temporary working directory, so each gets a fresh database and
+its own peak RSS. The corpus is bulk-loaded as rows, then --pdfs synthetic
+PDFs go through the upload endpoint and --queries distinct job descriptions
+through /match, all in-process via the Flask test client. Latencies are
+reported as p50/p95/p99 in milliseconds and every result is written to
+--output as JSON.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+SKILLS = ["Python", "Java", "SQL", "HTML", "CSS", "Cloud Computing", "Machine Learning", "Deep Learning", "C++",
+          "Verilog", "Xilinx", "Digital Circuit Design", "Analog Circuit Design", "JavaScript", "React", "Docker",
+          "Kubernetes", "AWS", "Django", "Flask", "Pandas", "TensorFlow", "Linux", "Git"]
+DEGREES = ["Bachelor of Technology", "B.Tech", "Master of Science", "M.Tech", "BSc", "MSc", "PhD", "Diploma"]
+FIELDS_OF_STUDY = ["Computer Science", "Electronics and Communication", "Electrical Engineering", "Data Science"]
+COMPANIES = ["Infosys", "TCS", "Wipro", "Accenture", "Amazon", "Google", "Cognizant", "HCL", "Tech Mahindra"]
+CERTIFICATIONS = ["AWS Certified Cloud Practitioner", "NPTEL certification in Data Structures", "Udemy course on React",
+                  "Google Data Analytics certification", "WIPRO Talent Next Java Full Stack", "Diploma in VLSI design"]
+FIRST_NAMES = ["Asha", "Ravi", "Sunil", "Priya", "Kiran", "Anil", "Divya", "Rahul", "Meena", "Arjun", "Sneha", "Vijay"]
+LAST_NAMES = ["Kumar", "Reddy", "Sharma", "Devi", "Rao", "Naidu", "Patel", "Iyer", "Singh", "Gupta"]
+ROLES = ["Python developer", "Java full stack developer", "VLSI design engineer", "data scientist",
+         "cloud engineer", "frontend developer", "machine learning engineer", "DevOps engineer"]
+
+
+def synthetic_resume(rng, i):
+    """Text and parsed row of one synthetic resume; i makes every resume unique."""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    email = f"{name.lower().replace(' ', '.')}{i}@example.com"
+    phone = f"9{i:09d}"[-10:]
+    skills = list(rng.choice(SKILLS, size=rng.integers(3, 8), replace=False))
+    years = int(rng.integers(0, 15))
+    degree = f"{rng.choice(DEGREES)} in {rng.choice(FIELDS_OF_STUDY)}, {rng.choice(LAST_NAMES)} University"
+    experience = [f"Worked at {rng.choice(COMPANIES)} for {years} years on {rng.choice(ROLES)} projects using "
+                  f"{', '.join(skills[:3])}",
+                  f"Internship at {rng.choice(COMPANIES)} building {rng.choice(ROLES)} tools in {skills[-1]}"]
+    certifications = list(rng.choice(CERTIFICATIONS, size=rng.integers(1, 3), replace=False))
+    lines = [name, f"{email} | {phone}", "EDUCATION", degree, "EXPERIENCE", *experience,
+             f"Skills: {', '.join(skills)}", "CERTIFICATIONS", *certifications, f"Resume reference {i}"]
+    row = {
+        "Name": name, "Email": email, "Phone": phone, "Education": degree,
+        "Experience": " | ".join(experience), "Skills": ", ".join(skills),
+        "Certifications": " | ".join(certifications), "FullText": " ".join(lines),
+    }
+    return "\n".join(lines), row
+
+
+def synthetic_job(rng, i):
+    skills = ", ".join(rng.choice(SKILLS, size=3, replace=False))
+    return f"{rng.choice(ROLES)} with {rng.integers(1, 8)} years of experience in {skills} (req {i})"
+
+
+def resume_pdf(text):
+    import pymupdf
+    document = pymupdf.open()
+    page = document.new_page()
+    page.insert_text((50, 60), text, fontsize=10)
+    data = document.tobytes()
+    document.close()
+    return data
+
+
+def percentiles(latencies):
+    values = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"count": len(values), "p50_ms": round(p50, 3), "p95_ms": round(p95, 3), "p99_ms": round(p99, 3),
+            "per_sec": round(len(values) / values.sum() * 1000, 1) if values.sum() else None}
+
+
+def timed_requests(client, requests):
+    latencies = []
+    for method, url, kwargs in requests:
+        start = time.perf_counter()
+        response = getattr(client, method)(url, **kwargs)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{url} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return latencies
+
+
+def wait_for_job(client, job_id, poll=0.05):
+    while True:
+        job = client.get(f"/jobs/{job_id}").get_json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(poll)
+
+
+def pdf_items(rng, start, count):
+    try:
+        return [(f"synthetic_{start + i}.pdf", resume_pdf(synthetic_resume(rng, start + i)[0])) for i in range(count)]
+    except ImportError:
+        print("⚠ PyMuPDF not installed, skipping the PDF upload benchmark")
+        return []
+
+
+def run_ranker(size, queries, pdfs, seed):
+    import ranker
+    rng = np.random.default_rng(seed)
+    client = ranker.app.test_client()
+    result = {}
+
+    rows = [synthetic_resume(rng, i)[1] for i in range(size)]
+    start = time.perf_counter()
+    ranker.candidate_store.append_many(rows)
+    result["bulk_insert_rows_per_sec"] = round(size / (time.perf_counter() - start), 1)
+    start = time.perf_counter()
+    ranker.sync_embeddings()
+    result["embed_rows_per_sec"] = round(size / (time.perf_counter() - start), 1)
+
+    items = pdf_items(rng, size, pdfs)
+    if items:
+        start = time.perf_counter()
+        response = client.post("/upload/batch", data={"files": [(io.BytesIO(data), name) for name, data in items]})
+        job = wait_for_job(client, response.get_json()["job_id"])
+        elapsed = time.perf_counter() - start
+        result["pdf_ingest"] = {"resumes": len(items), "status": job["status"], "seconds": round(elapsed, 2),
+                                "resumes_per_sec": round(len(items) / elapsed, 1)}
+
+    jobs = [synthetic_job(rng, i) for i in range(queries)]
+    result["match"] = {}
+    for mode, extra in [("semantic_top10", {"top_k": 10}), ("hybrid_top10", {"top_k": 10, "retrieval": "hybrid"}),
+                        ("filtered_top10", {"top_k": 10, "filters": {"skills": ["python"], "min_years": 2}})]:
+        ranker.result_cache.clear()
+        requests = [("post", "/match", {"json": {"job_description": job, **extra}}) for job in jobs]
+        result["match"][mode] = percentiles(timed_requests(client, requests))
+    requests = [("post", "/match", {"json": {"job_description": jobs[0], "top_k": 10}})] * queries
+    result["match"]["cached_repeat"] = percentiles(timed_requests(client, requests))
+    return result
+
+
+def run_app1(size, queries, pdfs, seed):
+    import app1
+    rng = np.random.default_rng(seed)
+    client = app1.app.test_client()
+    result = {}
+
+    rows = []
+    for i in range(size):
+        row = synthetic_resume(rng, i)[1]
+        rows.append({"Name": row["Name"], "Email": row["Email"], "Phone": row["Phone"], "Skills": row["Skills"],
+                     "Experience": row["Experience"], "Degree": row["Education"], "University": row["Education"],
+                     "CGPA": "", "FullText": row["FullText"]})
+    start = time.perf_counter()
+    app1.candidate_store.append_many(rows)
+    result["bulk_insert_rows_per_sec"] = round(size / (time.perf_counter() - start), 1)
+
+    items = pdf_items(rng, size, pdfs)
+    if items:
+        requests = [("post", "/upload", {"data": {"file": (io.BytesIO(data), name)}}) for name, data in items]
+        result["pdf_ingest"] = percentiles(timed_requests(client, requests))
+
+    jobs = [synthetic_job(rng, i) for i in range(queries)]
+    result["match"] = {}
+    for mode, extra in [("keyword_top10", {"top_k": 10}),
+                        ("filtered_top10", {"top_k": 10, "filters": {"skills": ["python"], "min_years": 2}})]:
+        app1.result_cache.clear()
+        requests = [("post", "/match", {"json": {"job_description": job, **extra}}) for job in jobs]
+        result["match"][mode] = percentiles(timed_requests(client, requests))
+    requests = [("post", "/match", {"json": {"job_description": jobs[0], "top_k": 10}})] * queries
+    result["match"]["cached_repeat"] = percentiles(timed_requests(client, requests))
+    return result
+
+
+RUNNERS = {"ranker": run_ranker, "app1": run_app1}
+
+
+def run_one(app, size, queries, pdfs, seed):
+    """Run one benchmark in this process and print its result as one JSON line."""
+    os.environ.setdefault("PERSIST_UPLOADS", "0")
+    sys.path.insert(0, BACKEND_DIR)
+    start = time.perf_counter()
+    result = RUNNERS[app](size, queries, pdfs, seed)
+    result.update({"app": app, "size": size, "seconds": round(time.perf_counter() - start, 2),
+                   "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)})
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--apps", nargs="+", choices=sorted(RUNNERS), default=["ranker", "app1"])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--pdfs", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--run", nargs=2, metavar=("APP", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_one(args.run[0], int(args.run[1]), args.queries, args.pdfs, args.seed)
+        sys.exit()
+
+    runs = []
+    for size in args.sizes:
+        for app in args.apps:
+            with tempfile.TemporaryDirectory(prefix=f"bench_{app}_{size}_") as workdir:
+                command = [sys.executable, os.path.abspath(__file__), "--run", app, str(size),
+                           "--queries", str(args.queries), "--pdfs", str(args.pdfs), "--seed", str(args.seed)]
+                completed = subprocess.run(command, cwd=workdir, capture_output=True, text=True)
+            if completed.returncode != 0:
+                print(f"❌ {app} at {size} failed:\n{completed.stderr[-2000:]}")
+                runs.append({"app": app, "size": size, "error": completed.stderr[-2000:]})
+                continue
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            runs.append(result)
+            summary = ", ".join(f"{mode} p50 {stats['p50_ms']} ms" for mode, stats in result["match"].items())
+            print(f"✅ {app} {size}: {summary}, peak RSS {result['peak_rss_mb']} MB")
+
+    report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+              "machine": platform.machine(), "cpus": os.cpu_count(), "runs": runs}
+    with open(args.output, "w") as out:
+        json.dump(report, out, indent=2)
+    print(f"✅ Results written to {args.output}")
@@ -0,0 +1,133 @@
+import math
+import re
+import threading
+from array import array
+import numpy as np
+import pandas as pd
+from scoring import top_k_indices
+
+BM25_FIELDS = ["Skills", "Experience", "Education", "Certifications", "FullText"]
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+STOP_WORDS = frozenset("a an and are as at be by for from has have in is it of on or that the to with".split())
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(str(text).lower()) if token not in STOP_WORDS]
+
+
+def document_tokens(row):
+    """Tokens of the indexed fields; section fields repeat text from FullText, which boosts them."""
+    return [token for field in BM25_FIELDS for token in tokenize(row.get(field, ""))]
+
+
+class BM25Index:
+    """In-memory inverted index with Okapi BM25 scoring, row-aligned with the candidate store.
+
+    Postings are compact per-term arrays of (doc id, term frequency, doc
+    length) that grow as rows are added, so a query only touches the
+    postings of its own terms, never the whole pool. Each doc also keeps
+    the codes of its terms, so it can be re-indexed from its new text alone.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.lock = threading.Lock()
+        self.reset()
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def reset(self):
+        self.postings = {}  # term -> (doc ids, term frequencies, doc lengths)
+        self.lengths = array('i')
+        self.total_length = 0
+        self.term_codes = {}  # term -> code
+        self.code_terms = []
+        self.doc_terms = []  # doc id -> codes of its distinct terms
+        # Last CandidateStore update number applied, see CandidateStore.updated_since.
+        self.update_seq = 0
+
+    def _code(self, term):
+        code = self.term_codes.get(term)
+        if code is None:
+            code = self.term_codes[term] = len(self.code_terms)
+            self.code_terms.append(term)
+        return code
+
+    def add(self, rows):
+        """Index rows as the next doc ids; postings are grouped per term in bulk rather than per token."""
+        docs = [document_tokens(row) for row in rows]
+        if not docs:
+            return
+        lengths = np.array([len(tokens) for tokens in docs], dtype=np.int64)
+        codes, terms = pd.factorize(pd.Series([token for tokens in docs for token in tokens], dtype=object))
+        local_ids = np.repeat(np.arange(len(docs)), lengths)
+        pairs, tfs = np.unique(codes.astype(np.int64) * len(docs) + local_ids, return_counts=True)
+        pair_codes, pair_docs = np.divmod(pairs, len(docs))
+        bounds = np.flatnonzero(np.diff(pair_codes)) + 1
+        with self.lock:
+            start = len(self.lengths)
+            for term_docs, term_tfs, code in zip(np.split(pair_docs, bounds), np.split(tfs, bounds),
+                                                 pair_codes[np.r_[0, bounds]] if len(pairs) else []):
+                ids, frequencies, doc_lengths = self.postings.setdefault(terms[code], (array('i'), array('i'), array('i')))
+                ids.frombytes((term_docs + start).astype(np.int32).tobytes())
+                frequencies.frombytes(term_tfs.astype(np.int32).tobytes())
+                doc_lengths.frombytes(lengths[term_docs].astype(np.int32).tobytes())
+            self.lengths.frombytes(lengths.astype(np.int32).tobytes())
+            self.total_length += int(lengths.sum())
+            term_ids = np.array([self._code(term) for term in terms], dtype=np.int32)
+            order = np.argsort(pair_docs, kind="stable")
+            doc_codes = term_ids[pair_codes[order]] if len(pairs) else np.empty(0, dtype=np.int32)
+            splits = np.cumsum(np.bincount(pair_docs, minlength=len(docs)))[:-1]
+            for term_codes in np.split(doc_codes, splits):
+                self.doc_terms.append(array('i', term_codes.tobytes()))
+
+    def _index(self, doc_id, tokens):
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for term, count in counts.items():
+            ids, tfs, lengths = self.postings.setdefault(term, (array('i'), array('i'), array('i')))
+            ids.append(doc_id)
+            tfs.append(count)
+            lengths.append(len(tokens))
+        self.doc_terms[doc_id] = array('i', (self._code(term) for term in counts))
+        return len(tokens)
+
+    def update(self, doc_id, row):
+        """Re-index one row in place from its new text."""
+        with self.lock:
+            for code in self.doc_terms[doc_id]:
+                posting = self.postings[self.code_terms[code]]
+                i = posting[0].index(doc_id)
+                for values in posting:
+                    del values[i]
+            length = self._index(doc_id, document_tokens(row))
+            self.total_length += length - self.lengths[doc_id]
+            self.lengths[doc_id] = length
+
+    def search(self, query, k):
+        """(ids, scores) of the k best-scoring rows; rows sharing no term with the query are never returned."""
+        terms = set(tokenize(query))
+        with self.lock:
+            count = len(self.lengths)
+            if count == 0:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            average_length = self.total_length / count or 1.0
+            matched = [tuple(np.array(values, dtype=np.int64) for values in self.postings[term])
+                       for term in terms if term in self.postings]
+        if not matched:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        doc_ids, contributions = [], []
+        for ids, tfs, lengths in matched:
+            tfs = tfs.astype(np.float32)
+            idf = math.log(1 + (count - len(ids) + 0.5) / (len(ids) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths / average_length)
+            doc_ids.append(ids)
+            contributions.append(idf * tfs * (self.k1 + 1) / (tfs + norm))
+        unique_ids, inverse = np.unique(np.concatenate(doc_ids), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(contributions)).astype(np.float32)
+        order = top_k_indices(scores, k)
+        return unique_ids[order], scores[order]
@@ -0,0 +1,52 @@
+import os
+import threading
+
+
+def file_signature(paths):
+    """(mtime, size) of each path, or None for paths that do not exist."""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class CandidateCache:
+    """Process-level cache of data parsed or derived from candidate files.
+
+    An entry is reused while the signature of the files it was built from is
+    unchanged, so writes from this process or any other worker invalidate it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, paths, loader):
+        signature = file_signature(paths)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        value = loader()
+        with self.lock:
+            self.entries[key] = (signature, value)
+        return value
+
+    def invalidate(self, key=None):
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
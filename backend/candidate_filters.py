@@ -0,0 +1,146 @@
+import re
+import threading
+from array import array
+import numpy as np
+from bm25_index import tokenize
+
+# Highest level found wins; patterns are checked against the education text and the full resume.
+DEGREE_LEVELS = {"diploma": 1, "bachelor": 2, "master": 3, "phd": 4}
+DEGREE_PATTERNS = [
+    (4, re.compile(r"\bph\.?\s?d\b|\bdoctorate\b", re.IGNORECASE)),
+    (3, re.compile(r"\bmaster'?s?\s+(?:of|in|degree)\b|\bm\.?\s?tech\b|\bm\.?\s?sc\b|\bmba\b|\bmca\b", re.IGNORECASE)),
+    (2, re.compile(r"\bbachelor'?s?\b|\bb\.?\s?tech\b|\bb\.?\s?sc\b|\bb\.e\b|\bbca\b|\bb\.?\s?com\b", re.IGNORECASE)),
+    (1, re.compile(r"\bdiploma\b", re.IGNORECASE)),
+]
+YEARS_PATTERN = re.compile(r"(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs?)\b", re.IGNORECASE)
+MAX_YEARS = 40
+FILTER_KEYS = {"skills", "min_years", "degree", "certifications"}
+
+
+def degree_level(text):
+    for level, pattern in DEGREE_PATTERNS:
+        if pattern.search(text):
+            return level
+    return 0
+
+
+def years_of_experience(text):
+    years = [float(match) for match in YEARS_PATTERN.findall(text)]
+    return max([value for value in years if value < MAX_YEARS], default=0.0)
+
+
+def facets(row):
+    """Normalised filter fields of one candidate row, computed once at ingest."""
+    text = lambda *fields: " ".join(str(row.get(field) or "") for field in fields)
+    return {
+        "years": years_of_experience(text("Experience", "FullText")),
+        "degree_level": degree_level(text("Education", "Degree", "University", "FullText")),
+        "skills": " ".join(sorted(set(tokenize(text("Skills"))))),
+        "certifications": " ".join(sorted(set(tokenize(text("Certifications"))))),
+    }
+
+
+def parse_filters(filters, keys=FILTER_KEYS):
+    """Validated filters from a /match request, or None; raises ValueError on bad input.
+
+    keys are the filters the caller's candidates have facets for.
+    """
+    if not filters:
+        return None
+    if not isinstance(filters, dict) or set(filters) - keys:
+        raise ValueError(f"filters may only contain {', '.join(sorted(keys))}")
+    parsed = {}
+    for key in ("skills", "certifications"):
+        values = filters.get(key) or []
+        if isinstance(values, str):
+            values = [values]
+        parsed[key] = sorted({" ".join(tokenize(value)) for value in values} - {""})
+    parsed["min_years"] = float(filters.get("min_years") or 0)
+    degree = filters.get("degree")
+    if degree and str(degree).lower() not in DEGREE_LEVELS:
+        raise ValueError(f"degree must be one of {', '.join(DEGREE_LEVELS)}")
+    parsed["degree_level"] = DEGREE_LEVELS[str(degree).lower()] if degree else 0
+    return parsed
+
+
+def matches(filters, row):
+    """Whether one facets row passes parsed filters; the per-row counterpart of FilterIndex.mask."""
+    if not filters:
+        return True
+    if float(row["years"] or 0) < filters["min_years"] or int(row["degree_level"] or 0) < filters["degree_level"]:
+        return False
+    for key in ("skills", "certifications"):
+        terms = set(str(row[key] or "").split())
+        if any(term not in terms for phrase in filters[key] for term in phrase.split()):
+            return False
+    return True
+
+
+class FilterIndex:
+    """Columnar filter fields, row-aligned with the candidate store.
+
+    Years and degree level are numpy columns; skill and certification terms
+    map to arrays of candidate ids. A filter becomes a boolean mask over
+    every row, built without touching the text or the embeddings.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def __len__(self):
+        return len(self.years)
+
+    def reset(self):
+        self.years = np.empty(0, dtype=np.float32)
+        self.degree_levels = np.empty(0, dtype=np.int8)
+        self.terms = {"skills": {}, "certifications": {}}
+        self.row_terms = {"skills": [], "certifications": []}
+        # Last CandidateStore update number applied, see CandidateStore.updated_since.
+        self.update_seq = 0
+
+    def add(self, rows):
+        """Append facet rows (dicts as returned by facets) as the next ids."""
+        rows = list(rows)
+        with self.lock:
+            start = len(self.years)
+            self.years = np.concatenate([self.years, np.array([row["years"] for row in rows], dtype=np.float32)])
+            self.degree_levels = np.concatenate([self.degree_levels,
+                                                 np.array([row["degree_level"] for row in rows], dtype=np.int8)])
+            for offset, row in enumerate(rows):
+                for key in self.terms:
+                    terms = str(row[key] or "").split()
+                    self.row_terms[key].append(terms)
+                    for term in terms:
+                        self.terms[key].setdefault(term, array('i')).append(start + offset)
+
+    def update(self, candidate_id, row):
+        with self.lock:
+            self.years[candidate_id] = row["years"]
+            self.degree_levels[candidate_id] = row["degree_level"]
+            for key in self.terms:
+                for term in self.row_terms[key][candidate_id]:
+                    ids = self.terms[key][term]
+                    del ids[ids.index(candidate_id)]
+                terms = str(row[key] or "").split()
+                self.row_terms[key][candidate_id] = terms
+                for term in terms:
+                    self.terms[key].setdefault(term, array('i')).append(candidate_id)
+
+    def mask(self, filters, count):
+        """Boolean mask over the first count rows, or None when there is nothing to filter on."""
+        if not filters:
+            return None
+        with self.lock:
+            indexed = min(count, len(self.years))
+            mask = np.zeros(count, dtype=bool)
+            mask[:indexed] = (self.years[:indexed] >= filters["min_years"]) & \
+                             (self.degree_levels[:indexed] >= filters["degree_level"])
+            for key in ("skills", "certifications"):
+                for phrase in filters[key]:
+                    for term in phrase.split():
+                        term_mask = np.zeros(count, dtype=bool)
+                        ids = np.array(self.terms[key].get(term, array('i')), dtype=np.int64)
+                        term_mask[ids[ids < count]] = True
+                        mask &= term_mask
+        return mask
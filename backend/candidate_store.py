@@ -0,0 +1,253 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+import pandas as pd
+from candidate_filters import facets
+from metrics import span
+from write_queue import GroupCommitWriter
+
+DB_FILE = "database/candidates.db"
+CANDIDATE_COLUMNS = ["Name", "Email", "Phone", "Education", "Experience", "Skills", "Certifications", "FullText"]
+FACET_COLUMNS = ["years", "degree_level", "skills", "certifications"]
+
+
+class CandidateStore:
+    """SQLite-backed candidate table with indexed contact columns.
+
+    A candidate's id is its 0-based insertion position, which keeps it
+    row-aligned with the embedding store and the ANN index. Normalised
+    filter fields are written to candidate_facets in the same transaction.
+
+    The database runs in WAL mode, so readers see a consistent snapshot
+    without blocking the writer. Writes go through one group-committing
+    writer thread: concurrent writes share a single BEGIN IMMEDIATE
+    transaction and fsync, each under its own savepoint so one failure does
+    not undo the others. Ids are counted inside that transaction, which
+    holds the database write lock, so workers never hand out the same id.
+
+    columns are the text columns of the candidates table; Email and Phone
+    must be among them.
+    """
+
+    def __init__(self, path=DB_FILE, columns=CANDIDATE_COLUMNS):
+        self.path = path
+        self.columns = columns
+        self.writer = GroupCommitWriter(self._commit, name="candidate-writer")
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = ", ".join(f'"{column}" TEXT' for column in self.columns)
+            conn.execute(f"CREATE TABLE IF NOT EXISTS candidates (id INTEGER PRIMARY KEY, {columns})")
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_candidates_email ON candidates ("Email")')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_candidates_phone ON candidates ("Phone")')
+            conn.execute("CREATE TABLE IF NOT EXISTS resume_hashes "
+                         "(sha256 TEXT PRIMARY KEY, candidate_id INTEGER, filename TEXT)")
+            conn.execute("CREATE TABLE IF NOT EXISTS candidate_facets (candidate_id INTEGER PRIMARY KEY, "
+                         "years REAL, degree_level INTEGER, skills TEXT, certifications TEXT)")
+            conn.execute("CREATE TABLE IF NOT EXISTS candidate_updates "
+                         "(seq INTEGER PRIMARY KEY AUTOINCREMENT, candidate_id INTEGER)")
+            self._backfill_facets(conn)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _commit(self, writes):
+        """Run queued (function, args) writes in one transaction; returns each result or exception."""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for function, args in writes:
+                conn.execute("SAVEPOINT write")
+                try:
+                    results.append(function(conn, *args))
+                    conn.execute("RELEASE write")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write")
+                    conn.execute("RELEASE write")
+                    results.append(e)
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return results
+
+    def _backfill_facets(self, conn):
+        """Compute facets for candidates stored before candidate_facets existed."""
+        quoted = ", ".join(f'c."{column}"' for column in self.columns)
+        missing = conn.execute(f"SELECT c.id, {quoted} FROM candidates c LEFT JOIN candidate_facets f "
+                               "ON f.candidate_id = c.id WHERE f.candidate_id IS NULL").fetchall()
+        _write_facets(conn, [row[0] for row in missing],
+                      _facet_values(dict(zip(self.columns, row[1:])) for row in missing))
+
+    def files(self):
+        """Files whose (mtime, size) change whenever candidates are written."""
+        return [self.path, self.path + "-wal"]
+
+    def count(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def append_many(self, rows, only_if_empty=False):
+        """Insert rows in one transaction and return their ids.
+
+        With only_if_empty nothing is written, and [] returned, unless the
+        table is empty when the write lock is taken.
+        """
+        rows = list(rows)
+        values = [tuple(_text(row.get(column)) for column in self.columns) for row in rows]
+        # Facets are computed here so the writer thread only runs SQL.
+        with span("store_write"):
+            return self.writer.write((_append_rows, (self.columns, values, _facet_values(rows), only_if_empty)))
+
+    def append(self, row):
+        return self.append_many([row])[0]
+
+    def update(self, candidate_id, row):
+        values = tuple(_text(row.get(column)) for column in self.columns)
+        with span("store_write"):
+            self.writer.write((_update_row, (self.columns, int(candidate_id), values, _facet_values([row])[0])))
+
+    def updated_since(self, seq):
+        """(ids of candidates updated in place after update number seq, latest update number).
+
+        Appended rows are not listed; in-memory indexes pick those up by
+        length, and use this to re-index rows another worker changed.
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT seq, candidate_id FROM candidate_updates WHERE seq > ? ORDER BY seq",
+                                (int(seq),)).fetchall()
+        if not rows:
+            return [], seq
+        return sorted({candidate_id for _, candidate_id in rows}), rows[-1][0]
+
+    def find_by_contact(self, email, phone):
+        """Ids of candidates sharing the email or phone number; placeholders never match."""
+        contacts = [(column, value) for column, value in (("Email", email), ("Phone", phone))
+                    if value and value != "Not Found"]
+        if not contacts:
+            return []
+        condition = " OR ".join(f'"{column}" = ?' for column, _ in contacts)
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT id FROM candidates WHERE {condition} ORDER BY id",
+                                [value for _, value in contacts]).fetchall()
+        return [row[0] for row in rows]
+
+    def find_hash(self, sha256):
+        """Candidate id of a previously ingested PDF with these exact bytes, if any."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT candidate_id FROM resume_hashes WHERE sha256 = ?", (sha256,)).fetchone()
+        return None if row is None else row[0]
+
+    def record_hashes(self, entries):
+        """Remember (sha256, candidate_id, filename) entries for later duplicate uploads."""
+        self.writer.write((_record_hashes, (list(entries),)))
+
+    def read(self, columns, start=0):
+        """Projected read of every candidate from position start onwards, in id order."""
+        with span("store_read"), self._connect() as conn:
+            return pd.read_sql_query(f"SELECT {self._select(columns)} FROM candidates WHERE id >= ? ORDER BY id",
+                                     conn, params=(int(start),))
+
+    def read_facets(self, start=0):
+        """Facet rows of every candidate from position start onwards, in id order."""
+        with self._connect() as conn:
+            return pd.read_sql_query(f"SELECT {', '.join(FACET_COLUMNS)} FROM candidate_facets "
+                                     "WHERE candidate_id >= ? ORDER BY candidate_id", conn, params=(int(start),))
+
+    def fetch_facets(self, ids, chunk_size=900):
+        """Facet rows of ids, as dicts in the order the ids were given."""
+        ids = [int(i) for i in ids]
+        found = {}
+        with self._connect() as conn:
+            for i in range(0, len(ids), chunk_size):
+                chunk = ids[i:i + chunk_size]
+                query = (f"SELECT candidate_id, {', '.join(FACET_COLUMNS)} FROM candidate_facets "
+                         f"WHERE candidate_id IN ({', '.join('?' * len(chunk))})")
+                for row in conn.execute(query, chunk):
+                    found[row[0]] = dict(zip(FACET_COLUMNS, row[1:]))
+        return [found[i] for i in ids if i in found]
+
+    def fetch(self, ids, columns, chunk_size=900):
+        """Projected rows for ids, as dicts in the order the ids were given."""
+        ids = [int(i) for i in ids]
+        found = {}
+        with span("store_read"), self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            for i in range(0, len(ids), chunk_size):
+                chunk = ids[i:i + chunk_size]
+                query = (f"SELECT id, {self._select(columns)} FROM candidates "
+                         f"WHERE id IN ({', '.join('?' * len(chunk))})")
+                for row in conn.execute(query, chunk):
+                    found[row["id"]] = {column: row[column] for column in columns}
+        return [found[i] for i in ids if i in found]
+
+    def _select(self, columns):
+        unknown = set(columns) - set(self.columns)
+        if unknown:
+            raise ValueError(f"Unknown candidate columns: {sorted(unknown)}")
+        return ", ".join(f'"{column}"' for column in columns)
+
+    def import_csv(self, csv_path):
+        """One-off import of a legacy candidates.csv into an empty store.
+
+        Workers starting together may all get this far; emptiness is checked
+        again inside the write transaction, so only the first one imports.
+        """
+        if self.count() > 0 or not os.path.exists(csv_path) or os.stat(csv_path).st_size == 0:
+            return 0
+        df = pd.read_csv(csv_path, encoding='utf-8', dtype=str, keep_default_na=False)
+        ids = self.append_many(df.to_dict("records"), only_if_empty=True)
+        if not ids:
+            return 0
+        print(f"✅ Imported {len(ids)} candidates from {csv_path}")
+        return len(ids)
+
+
+def _facet_values(rows):
+    return [tuple(row_facets[column] for column in FACET_COLUMNS) for row_facets in map(facets, rows)]
+
+
+def _write_facets(conn, ids, facet_values):
+    """INSERT OR REPLACE the facets of candidates ids."""
+    conn.executemany(f"INSERT OR REPLACE INTO candidate_facets (candidate_id, {', '.join(FACET_COLUMNS)}) "
+                     f"VALUES (?, {', '.join('?' * len(FACET_COLUMNS))})",
+                     [(candidate_id, *values) for candidate_id, values in zip(ids, facet_values)])
+
+
+# Writer-thread halves of the public write methods; each runs inside a group commit.
+def _append_rows(conn, columns, values, facet_values, only_if_empty=False):
+    start = conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+    if only_if_empty and start > 0:
+        return []
+    placeholders = ", ".join("?" * (len(columns) + 1))
+    quoted = ", ".join(f'"{column}"' for column in columns)
+    conn.executemany(f"INSERT INTO candidates (id, {quoted}) VALUES ({placeholders})",
+                     [(start + i, *row) for i, row in enumerate(values)])
+    ids = list(range(start, start + len(values)))
+    _write_facets(conn, ids, facet_values)
+    return ids
+
+
+def _update_row(conn, columns, candidate_id, values, facet_values):
+    assignments = ", ".join(f'"{column}" = ?' for column in columns)
+    conn.execute(f"UPDATE candidates SET {assignments} WHERE id = ?", (*values, candidate_id))
+    _write_facets(conn, [candidate_id], [facet_values])
+    conn.execute("INSERT INTO candidate_updates (candidate_id) VALUES (?)", (candidate_id,))
+
+
+def _record_hashes(conn, entries):
+    conn.executemany("INSERT OR REPLACE INTO resume_hashes (sha256, candidate_id, filename) VALUES (?, ?, ?)",
+                     entries)
+
+
+def _text(value):
+    return "" if value is None or (isinstance(value, float) and value != value) else str(value)
@@ -0,0 +1,56 @@
+import re
+import numpy as np
+from metrics import span
+
+CHUNK_OVERLAP = 32
+DEFAULT_MAX_TOKENS = 256
+POOLING = "mean"
+
+
+def token_spans(text, tokenizer=None):
+    """(start, end) character offsets of each token.
+
+    Uses the model's fast tokenizer when it can report offsets, otherwise
+    words and punctuation, which never outnumber the word pieces they become.
+    """
+    if tokenizer is not None and getattr(tokenizer, "is_fast", False):
+        return tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)["offset_mapping"]
+    return [match.span() for match in re.finditer(r"\w+|[^\w\s]", text)]
+
+
+def chunk_text(text, model, overlap=CHUNK_OVERLAP):
+    """Split text into overlapping windows that each fit the model's sequence length."""
+    max_tokens = (getattr(model, "max_seq_length", None) or DEFAULT_MAX_TOKENS) - 2  # [CLS] and [SEP]
+    spans = token_spans(text, getattr(model, "tokenizer", None))
+    if len(spans) <= max_tokens:
+        return [text]
+    step = max_tokens - overlap
+    return [text[spans[start][0]:spans[min(start + max_tokens, len(spans)) - 1][1]]
+            for start in range(0, len(spans) - overlap, step)]
+
+
+def pool_chunks(embeddings, owners, count, pooling=POOLING):
+    """Pool chunk embeddings into one L2-normalised vector per owner index in range(count)."""
+    owners = np.asarray(owners)
+    if pooling == "max":
+        pooled = np.full((count, embeddings.shape[1]), -np.inf, dtype=np.float32)
+        np.maximum.at(pooled, owners, embeddings)
+    elif pooling == "mean":
+        pooled = np.zeros((count, embeddings.shape[1]), dtype=np.float32)
+        np.add.at(pooled, owners, embeddings)
+    else:
+        raise ValueError(f"Unknown pooling: {pooling}")
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    return pooled / np.where(norms == 0, 1, norms)
+
+
+def encode_texts(model, texts, pooling=POOLING):
+    """Encode every chunk of every text in one batched call and pool them back to one vector per text."""
+    chunks, owners = [], []
+    for i, text in enumerate(texts):
+        pieces = chunk_text(text, model)
+        chunks.extend(pieces)
+        owners.extend([i] * len(pieces))
+    with span("encode"):
+        embeddings = model.encode(chunks, convert_to_numpy=True, normalize_embeddings=True)
+    return pool_chunks(np.asarray(embeddings, dtype=np.float32), owners, len(texts), pooling)
@@ -0,0 +1,198 @@
+import os
+import numpy as np
+from mapped_arrays import MappedArrays
+from chunking import POOLING, encode_texts
+from scoring import top_k_indices, weighted_similarity
+
+EMBEDDINGS_FILE = "database/embeddings.json"
+EMBEDDING_FIELDS = ["Skills", "Experience", "Certifications", "FullText"]
+# Stored alongside the vectors; a file written with another layout is re-encoded.
+EMBEDDING_LAYOUT = f"chunked-{POOLING}:" + ",".join(EMBEDDING_FIELDS)
+EMBEDDING_DTYPES = ("float32", "float16", "int8")
+DTYPE_ENV = "EMBEDDING_DTYPE"
+RERANK_ENV = "EMBEDDING_RERANK"
+SCORE_BLOCK_ROWS = 4096
+
+
+class EmbeddingStore:
+    """Per-candidate field embeddings, row-aligned with the candidate store.
+
+    Vectors are L2-normalised and written row by row as (rows, fields, dim)
+    MappedArrays files, with the layout and dtype in their header, so every
+    worker shares one copy and appends only write the new rows.
+
+    Scoring scans a compact copy: int8 with one scale per row and field, or
+    float16 (EMBEDDING_DTYPE, int8 by default). The float32 file is read only
+    for the rows being updated, compared or re-ranked: a top-k search rescores
+    the best k * EMBEDDING_RERANK (default 4, 0 disables it) compact scores in
+    float32. Long fields are embedded as overlapping chunks pooled into one
+    vector.
+    """
+
+    def __init__(self, path=EMBEDDINGS_FILE, dtype=None, rerank=None):
+        self.path = path
+        self.dtype = dtype or os.environ.get(DTYPE_ENV, "int8")
+        if self.dtype not in EMBEDDING_DTYPES:
+            raise ValueError(f"Embedding dtype must be one of {', '.join(EMBEDDING_DTYPES)}")
+        self.rerank = int(os.environ.get(RERANK_ENV, 4)) if rerank is None else rerank
+        self.arrays = MappedArrays(path)
+        self.reset()
+        self.load()
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def stacked(self):
+        """(fields, rows, dim) float32 view of the memory-mapped vectors."""
+        return None if self.vectors is None else self.vectors.transpose(1, 0, 2)
+
+    def load(self):
+        try:
+            header = self.arrays.read_header()
+            if header is None:
+                if os.path.exists(self.arrays.file("npz")):
+                    self._import_npz()
+                return
+            if header.get("layout") != EMBEDDING_LAYOUT:
+                print("⚠ Embedding store has an old layout, re-encoding...")
+                return
+            self.rows, self.dim = int(header["rows"]), header["dim"]
+            self._map(compact=header.get("dtype") == self.dtype)
+            if header.get("dtype") != self.dtype:
+                print(f"⚠ Embedding store is {header.get('dtype')}, converting to {self.dtype}...")
+                for start in range(0, self.rows, SCORE_BLOCK_ROWS):
+                    self._write_rows(start, np.asarray(self.vectors[start:start + SCORE_BLOCK_ROWS]), compact_only=True)
+                self.save()
+        except Exception as e:
+            print("⚠ Embedding store unreadable, rebuilding:", e)
+            self.reset()
+
+    def _import_npz(self):
+        """Convert an embeddings.npz written before the memory-mapped format."""
+        try:
+            with np.load(self.arrays.file("npz")) as data:
+                if "layout" not in data.files or str(data["layout"]) != EMBEDDING_LAYOUT:
+                    return
+                stacked = data["embeddings"].astype(np.float32)
+        except Exception as e:
+            print("⚠ Old embedding store unreadable, re-encoding:", e)
+            return
+        self.append({field: stacked[i] for i, field in enumerate(EMBEDDING_FIELDS)})
+        print(f"✅ Converted {self.rows} embeddings to the memory-mapped format")
+
+    def _map(self, compact=True):
+        if self.rows == 0:
+            self.vectors = self.compact = self.scales = None
+            return
+        shape = (self.rows, len(EMBEDDING_FIELDS), self.dim)
+        self.vectors = self.arrays.map("f32", np.float32, shape)
+        self.compact, self.scales = self.vectors, None
+        if compact and self.dtype != "float32":
+            self.compact = self.arrays.map(self.dtype, self.dtype, shape)
+        if compact and self.dtype == "int8":
+            self.scales = self.arrays.map("scales", np.float32, shape[:2])
+
+    def refresh(self):
+        if self.arrays.changed():
+            self.reset()
+            self.load()
+
+    def save(self):
+        self.arrays.publish({"layout": EMBEDDING_LAYOUT, "dtype": self.dtype, "rows": self.rows, "dim": self.dim})
+        self._map()
+
+    def reset(self):
+        self.rows = 0
+        self.dim = None
+        self.vectors = self.compact = self.scales = None
+
+    def _encoded(self, rows, compact_only=False):
+        """(file kind, array) pairs to write for float32 rows of shape (n, fields, dim)."""
+        if not compact_only:
+            yield "f32", rows
+        if self.dtype == "float16":
+            yield "float16", rows.astype(np.float16)
+        elif self.dtype == "int8":
+            scales = np.maximum(np.abs(rows).max(axis=2), 1e-12) / 127
+            yield "int8", np.round(rows / scales[:, :, None]).astype(np.int8)
+            yield "scales", scales.astype(np.float32)
+
+    def _write_rows(self, start, rows, compact_only=False):
+        for kind, values in self._encoded(rows, compact_only):
+            self.arrays.write_rows(kind, start, values, self.rows)
+
+    def append(self, field_vectors):
+        """Append rows; field_vectors maps each field to an (n, dim) array."""
+        new_rows = np.stack([np.atleast_2d(np.asarray(field_vectors[field], dtype=np.float32))
+                             for field in EMBEDDING_FIELDS], axis=1)
+        if len(new_rows) == 0:
+            return
+        self.dim = self.dim or new_rows.shape[2]
+        self._write_rows(self.rows, new_rows)
+        self.rows += len(new_rows)
+        self.save()
+
+    def update(self, row, field_vectors):
+        """Overwrite one row's vectors; field_vectors maps each field to a (1, dim) array."""
+        new_row = np.stack([np.asarray(field_vectors[field], dtype=np.float32).reshape(-1)
+                            for field in EMBEDDING_FIELDS])[None]
+        self._write_rows(row, new_row)
+        self.save()
+
+    def matrix(self, field):
+        return self.stacked[EMBEDDING_FIELDS.index(field)]
+
+    def scores(self, weights, queries, ids=None, block_rows=SCORE_BLOCK_ROWS):
+        """Weighted cosine of every row, or of ids only, computed on the compact copy a block at a time.
+
+        queries is one vector, giving (rows,) scores, or a (queries, dim)
+        matrix, giving (rows, queries) scores from one product per block.
+        """
+        weights = np.asarray(weights, dtype=np.float32)
+        queries = np.asarray(queries, dtype=np.float32)
+        matrix = np.atleast_2d(queries)
+        count = self.rows if ids is None else len(ids)
+        scores = np.empty((count, len(matrix)), dtype=np.float32)
+        for start in range(0, count, block_rows):
+            rows = slice(start, start + block_rows) if ids is None else ids[start:start + block_rows]
+            field_scores = self.compact[rows].astype(np.float32) @ matrix.T
+            if self.scales is not None:
+                field_scores *= self.scales[rows][:, :, None]
+            scores[start:start + block_rows] = np.tensordot(field_scores, weights, axes=([1], [0]))
+        return scores if queries.ndim == 2 else scores[:, 0]
+
+    def search(self, weights, query, k=None, ids=None):
+        """(ids, scores) of the k best rows, or the k best of ids, best first."""
+        return self.search_many(weights, np.atleast_2d(query), k, ids)[0]
+
+    def search_many(self, weights, queries, k=None, ids=None):
+        """search for every row of a (queries, dim) matrix, scoring them all in one pass over the rows."""
+        if self.rows == 0:
+            return [(np.arange(0), np.zeros(0, dtype=np.float32)) for _ in queries]
+        scores = self.scores(weights, queries, ids)
+        results = []
+        for i, query in enumerate(queries):
+            if self.rerank and k is not None and self.compact is not self.vectors:
+                shortlist = top_k_indices(scores[:, i], k * self.rerank)
+                rows = shortlist if ids is None else ids[shortlist]
+                exact = weighted_similarity(self.stacked[:, rows], weights, query)
+                order = top_k_indices(exact, k)
+                results.append((rows[order], exact[order]))
+            else:
+                order = top_k_indices(scores[:, i], k)
+                results.append(((order if ids is None else ids[order]), scores[order, i]))
+        return results
+
+
+def field_texts(row):
+    """Text of each embedded field, as rank_resumes has always read it."""
+    return [str(row.get(field, "")) for field in EMBEDDING_FIELDS]
+
+
+def encode_rows(model, rows):
+    """Encode the chunks of every embedded field of many rows in a single batched call."""
+    texts = [text for row in rows for text in field_texts(row)]
+    embeddings = encode_texts(model, texts)
+    embeddings = embeddings.reshape(len(rows), len(EMBEDDING_FIELDS), -1)
+    return {field: embeddings[:, i, :] for i, field in enumerate(EMBEDDING_FIELDS)}
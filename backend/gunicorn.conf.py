@@ -0,0 +1,10 @@
+# gunicorn -c gunicorn.conf.py ranker:app
+# Loads the models once in the master before forking so workers share them copy-on-write.
+import os
+
+os.environ.setdefault("PRELOAD_MODELS", "1")
+
+bind = "127.0.0.1:5000"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+preload_app = True
+timeout = 120
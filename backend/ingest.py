@@ -0,0 +1,74 @@
+"""Bulk resume ingestion.
+
+    python ingest.py <directory> [--workers N]
+
+Run from the backend directory. PDFs are parsed across a process pool and
+stored in one bulk write; their embeddings are encoded in batches.
+"""
+import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from resume_parser import allowed_file, parse_resume
+
+_pool = None
+
+
+def get_pool(workers=None):
+    """Process pool shared by every batch upload handled in this process."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=workers)
+    return _pool
+
+
+def parse_many(items, workers=None):
+    """Parse (name, path) items in parallel, preserving their order."""
+    items = list(items)
+    if len(items) <= 1:
+        return [parse_resume(item) for item in items]
+    chunksize = max(1, len(items) // (4 * (workers or os.cpu_count() or 1)))
+    return list(get_pool(workers).map(parse_resume, items, chunksize=chunksize))
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_sha256(source):
+    """sha256 of a PDF given as a path or as the bytes of an upload."""
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha256(source).hexdigest()
+    return file_sha256(source)
+
+
+def find_resumes(directory):
+    return sorted((name, os.path.join(directory, name)) for name in os.listdir(directory)
+                  if allowed_file(name) and os.path.isfile(os.path.join(directory, name)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory")
+    parser.add_argument("--workers", type=int, help="parser processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    from ranker import ingest_resumes
+
+    items = find_resumes(args.directory)
+    start = time.perf_counter()
+    summary = ingest_resumes(items, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Ingested {summary['ingested']} of {len(items)} resumes in {elapsed:.1f}s "
+          f"({summary['ingested'] / elapsed if elapsed else 0:.1f} resumes/sec)")
+    for name in summary["failed"]:
+        print("⚠ No text extracted from", name)
+    for name in summary["duplicates"]:
+        print("⚠ Already ingested:", name)
+    for name in summary["updated"]:
+        print("⚠ Updated an existing candidate from:", name)
@@ -0,0 +1,66 @@
+import json
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+JOBS_DB_FILE = "database/jobs.db"
+
+
+class JobQueue:
+    """Background worker pool whose job status lives in SQLite.
+
+    Jobs run on in-process threads; keeping their status in a shared file lets
+    any worker process answer a /jobs/<id> poll.
+    """
+
+    def __init__(self, path=JOBS_DB_FILE, workers=2):
+        self.path = path
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upload-job")
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, kind TEXT, status TEXT, "
+                         "created REAL, started REAL, finished REAL, result TEXT, error TEXT)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def submit(self, kind, fn, *args):
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute("INSERT INTO jobs (id, kind, status, created) VALUES (?, ?, 'queued', ?)",
+                         (job_id, kind, time.time()))
+        self.executor.submit(self._run, job_id, fn, args)
+        return job_id
+
+    def _run(self, job_id, fn, args):
+        self._update(job_id, status="running", started=time.time())
+        try:
+            result = fn(*args)
+        except Exception as e:
+            print(f"❌ Job {job_id} failed:", e)
+            self._update(job_id, status="failed", finished=time.time(), error=str(e))
+        else:
+            self._update(job_id, status="done", finished=time.time(), result=json.dumps(result))
+
+    def _update(self, job_id, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
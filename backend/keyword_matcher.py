@@ -0,0 +1,65 @@
+import bisect
+import re
+
+
+class KeywordMatcher:
+    """Finds the keywords of several categories in one regex pass over a text.
+
+    categories maps a category name to its keyword list and options:
+    case_sensitive (default False) and whole_words (default False). Whole-word
+    keywords only match where they are not glued to other letters or digits,
+    which also works for keywords such as "C++" or "B.Tech" where \\b does not.
+
+    Every keyword is compiled into a single alternation of plain lowercase
+    literals scanned over the lowercased text, which lets the regex engine
+    skip ahead on the first character; case and word-boundary checks are
+    applied to the few hits afterwards.
+    """
+
+    def __init__(self, categories):
+        self.categories = list(categories)
+        self.entries = {}
+        for category, spec in categories.items():
+            for keyword in spec["keywords"]:
+                self.entries.setdefault(keyword.lower(), []).append(
+                    (category, keyword, spec.get("case_sensitive", False), spec.get("whole_words", False)))
+        literals = "|".join(re.escape(literal) for literal in sorted(self.entries, key=len, reverse=True))
+        self.regex = re.compile(literals)
+        self.fallback_regex = re.compile(literals, re.IGNORECASE)
+
+    def scan(self, text):
+        """{category: [(start, keyword), ...]} for every hit, in text order."""
+        hits = {category: [] for category in self.categories}
+        lowered = text.lower()
+        # Lowercasing a few non-ASCII characters changes the text length.
+        matches = self.regex.finditer(lowered) if len(lowered) == len(text) else self.fallback_regex.finditer(text)
+        for match in matches:
+            start, end = match.span()
+            for category, keyword, case_sensitive, whole_words in self.entries[match.group().lower()]:
+                if case_sensitive and text[start:end] != keyword:
+                    continue
+                if whole_words and not _on_word_boundaries(text, start, end):
+                    continue
+                hits[category].append((start, keyword))
+        return hits
+
+
+def _on_word_boundaries(text, start, end):
+    before = text[start - 1] if start > 0 else ""
+    after = text[end] if end < len(text) else ""
+    return not (before.isalnum() and text[start].isalnum()) and not (after.isalnum() and text[end - 1].isalnum())
+
+
+def found_keywords(hits):
+    """{category: distinct keywords hit, in first-occurrence order}."""
+    return {category: list(dict.fromkeys(keyword for _, keyword in category_hits))
+            for category, category_hits in hits.items()}
+
+
+def hit_lines(lines, hits):
+    """{category: indices of the lines containing a hit}, for hits scanned over "\\n".join(lines)."""
+    starts = [0]
+    for line in lines[:-1]:
+        starts.append(starts[-1] + len(line) + 1)
+    return {category: sorted({bisect.bisect_right(starts, start) - 1 for start, _ in category_hits})
+            for category, category_hits in hits.items()}
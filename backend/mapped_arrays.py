@@ -0,0 +1,61 @@
+import json
+import os
+import numpy as np
+from candidate_cache import file_signature
+
+
+class MappedArrays:
+    """Raw array files that every worker memory-maps, published through a JSON header.
+
+    Each array lives in <path without extension>.<kind> as plain bytes, so
+    workers share one copy through the page cache. Rows are written first
+    and the header, holding the number of valid rows and whatever else the
+    owner needs to map them, is replaced last, so readers never map rows
+    still being written. A file rewritten from its first row is swapped in
+    whole instead of truncated, since another worker may be mapping it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.signature = None
+
+    def file(self, kind):
+        return os.path.splitext(self.path)[0] + "." + kind
+
+    def read_header(self):
+        """The published header, or None when nothing has been written yet."""
+        self.signature = file_signature([self.path])
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def changed(self):
+        """Whether another process has published since we last read or wrote the header."""
+        return file_signature([self.path]) != self.signature
+
+    def publish(self, header):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            json.dump(header, out)
+        os.replace(tmp_path, self.path)
+        self.signature = file_signature([self.path])
+
+    def map(self, kind, dtype, shape):
+        return np.memmap(self.file(kind), dtype=dtype, mode="r", shape=shape)
+
+    def write_rows(self, kind, start, values, published):
+        """Write values over rows start.. of one file; published is the valid row count."""
+        path = self.file(kind)
+        if start == 0 and len(values) >= published or not os.path.exists(path):
+            self.replace(kind, values)
+            return
+        # Written in place, never truncated: bytes past the published rows are simply ignored.
+        with open(path, "r+b") as out:
+            out.seek(start * (values.nbytes // len(values)))
+            out.write(np.ascontiguousarray(values).tobytes())
+
+    def replace(self, kind, values):
+        tmp_path = self.file(kind) + ".tmp"
+        np.ascontiguousarray(values).tofile(tmp_path)
+        os.replace(tmp_path, self.file(kind))
@@ -0,0 +1,197 @@
+import cProfile
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from flask import g, request
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROFILE_ENV = "PROFILE_REQUESTS"
+PROFILE_SLOW_MS_ENV = "PROFILE_SLOW_MS"
+PROFILE_HEADER_ENV = "PROFILE_HEADER"
+PROFILE_MAX_FILES_ENV = "PROFILE_MAX_FILES"
+PROFILE_DIR = "profiles"
+
+
+class Metrics:
+    """Process-local counters and latency histograms, rendered in the Prometheus text format.
+
+    Each gunicorn worker keeps its own numbers; scrape the workers
+    individually or sum them in Prometheus.
+    """
+
+    def __init__(self, namespace="resume", buckets=BUCKETS):
+        self.namespace = namespace
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.help = {}
+        self.counters = {}    # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [bucket counts, sum, count]
+        self.collectors = {}  # name -> (kind, callback)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, _labels(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _labels(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            i = bisect_left(self.buckets, seconds)
+            if i < len(self.buckets):
+                histogram[0][i] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    @contextmanager
+    def span(self, stage):
+        """Time the enclosed block into the stage_seconds histogram, even when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - start, stage=stage)
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    def add_collector(self, name, kind, callback, text=""):
+        """Report values read at scrape time; callback returns a list of (labels dict, value)."""
+        self.collectors[name] = (kind, callback)
+        if text:
+            self.describe(name, text)
+
+    def render(self):
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, (list(counts), total, count))
+                                for key, (counts, total, count) in self.histograms.items())
+        lines, declared = [], set()
+
+        def declare(name, kind):
+            if name not in declared:
+                declared.add(name)
+                if name in self.help:
+                    lines.append(f"# HELP {self.namespace}_{name} {self.help[name]}")
+                lines.append(f"# TYPE {self.namespace}_{name} {kind}")
+
+        for (name, labels), value in counters:
+            declare(name, "counter")
+            lines.append(f"{self.namespace}_{name}{_render_labels(labels)} {value}")
+        for (name, labels), (counts, total, count) in histograms:
+            declare(name, "histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.namespace}_{name}_bucket{_render_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{self.namespace}_{name}_bucket{_render_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{self.namespace}_{name}_sum{_render_labels(labels)} {total}")
+            lines.append(f"{self.namespace}_{name}_count{_render_labels(labels)} {count}")
+        for name, (kind, callback) in list(self.collectors.items()):
+            declare(name, kind)
+            for labels, value in callback():
+                if value is not None:
+                    lines.append(f"{self.namespace}_{name}{_render_labels(_labels(labels))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _render_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+REGISTRY = Metrics()
+REGISTRY.describe("stage_seconds", "Time spent in each upload and match stage.")
+REGISTRY.describe("request_seconds", "Request latency by endpoint.")
+REGISTRY.describe("candidates_scored_total", "Candidate rows scored against a job description.")
+span = REGISTRY.span
+inc = REGISTRY.inc
+
+
+def add_cache_collectors(caches, registry=REGISTRY):
+    """Export the hit and miss counts of named caches (anything with a stats() dict)."""
+    for stat in ("hits", "misses"):
+        registry.add_collector(f"cache_{stat}_total", "counter",
+                               lambda stat=stat: [({"cache": name}, cache.stats()[stat]) for name, cache in caches.items()])
+
+
+def add_model_collector(models, registry=REGISTRY):
+    registry.add_collector("model_load_seconds", "gauge",
+                           lambda: [({"model": name}, status["load_seconds"]) for name, status in models.status().items()],
+                           "Seconds each model took to load.")
+
+
+def instrument(app, registry=REGISTRY):
+    """Record per-endpoint request latency and, when enabled, profile requests.
+
+    PROFILE_REQUESTS=1 profiles every request and writes those slower than
+    PROFILE_SLOW_MS (default 500) to profiles/ as .prof files for pstats or
+    snakeviz. With PROFILE_HEADER=1 a single request can also ask for it
+    with an X-Profile: 1 header. Only the newest PROFILE_MAX_FILES (default
+    100) profiles are kept.
+    """
+    enabled = lambda name: os.environ.get(name, "").lower() in ("1", "true", "yes")
+    profile_all = enabled(PROFILE_ENV)
+    allow_header = enabled(PROFILE_HEADER_ENV)
+    slow_seconds = float(os.environ.get(PROFILE_SLOW_MS_ENV, 500)) / 1000
+    max_files = int(os.environ.get(PROFILE_MAX_FILES_ENV, 100))
+    asked = lambda: allow_header and request.headers.get("X-Profile") == "1"
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+        g.profiler = None
+        if profile_all or asked():
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                return  # another request on this process is already being profiled
+            g.profiler = profiler
+
+    @app.after_request
+    def record_request(response):
+        elapsed = time.perf_counter() - g.get("metrics_start", time.perf_counter())
+        registry.observe("request_seconds", elapsed, endpoint=request.endpoint or "unknown", method=request.method)
+        registry.inc("requests_total", endpoint=request.endpoint or "unknown", status=response.status_code)
+        profiler = g.get("profiler")
+        if profiler is not None:
+            profiler.disable()
+            if elapsed >= slow_seconds or asked():
+                os.makedirs(PROFILE_DIR, exist_ok=True)
+                path = os.path.join(PROFILE_DIR, f"{request.endpoint or 'unknown'}-{time.strftime('%Y%m%d-%H%M%S')}-"
+                                                 f"{os.getpid()}-{time.time_ns() // 1000 % 1000000:06d}-"
+                                                 f"{int(elapsed * 1000)}ms.prof")
+                profiler.dump_stats(path)
+                prune_profiles(max_files)
+                print(f"⚠ {request.path} took {elapsed * 1000:.0f} ms, profile written to {path}")
+            g.profiler = None
+        return response
+
+    @app.teardown_request
+    def stop_profiler(exc):
+        profiler = g.get("profiler")
+        if profiler is not None:
+            profiler.disable()
+
+
+def prune_profiles(keep, directory=PROFILE_DIR):
+    """Delete all but the newest keep .prof files."""
+    profiles = [entry for entry in os.scandir(directory) if entry.name.endswith(".prof")]
+    profiles.sort(key=lambda entry: entry.stat().st_mtime_ns, reverse=True)
+    for entry in profiles[keep:]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass  # pruned by another worker
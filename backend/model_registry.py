@@ -0,0 +1,52 @@
+import os
+import threading
+import time
+
+PRELOAD_ENV = "PRELOAD_MODELS"
+
+
+class ModelRegistry:
+    """Loads named models on first use instead of at import time.
+
+    Set PRELOAD_MODELS=1 and run gunicorn with --preload (see gunicorn.conf.py)
+    to load them once in the master; forked workers then share the weights
+    copy-on-write instead of each loading its own copy.
+    """
+
+    def __init__(self):
+        self.created = time.time()
+        self._loaders = {}
+        self._models = {}
+        self._load_seconds = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        self._loaders[name] = loader
+
+    def get(self, name):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._lock:
+            if name not in self._models:
+                start = time.perf_counter()
+                self._models[name] = self._loaders[name]()
+                self._load_seconds[name] = round(time.perf_counter() - start, 2)
+                print(f"✅ Loaded model {name} in {self._load_seconds[name]}s")
+            return self._models[name]
+
+    def warm(self, names=None):
+        for name in names or self._loaders:
+            self.get(name)
+
+    def warm_if_preloading(self):
+        if os.environ.get(PRELOAD_ENV, "").lower() in ("1", "true", "yes"):
+            self.warm()
+
+    @property
+    def is_warm(self):
+        return all(name in self._models for name in self._loaders)
+
+    def status(self):
+        return {name: {"loaded": name in self._models, "load_seconds": self._load_seconds.get(name)}
+                for name in self._loaders}
@@ -0,0 +1,117 @@
+"""PDF text extraction engines.
+
+PyMuPDF is the fast path; pdfplumber's slower layout analysis only runs when
+PyMuPDF is unavailable, fails, or finds no text. Sources are file paths or
+raw bytes. Pages are streamed through generators and joined once.
+"""
+import io
+import os
+import pdfplumber
+from metrics import span
+
+try:
+    import pymupdf
+except ImportError:
+    try:
+        import fitz as pymupdf  # PyMuPDF before 1.24
+    except ImportError:
+        pymupdf = None
+
+MAX_PAGES = 20
+MAX_BYTES = 10 * 1024 * 1024
+PARALLEL_MIN_PAGES = 16
+PAGE_SEPARATOR = " \n"
+
+
+class PDFTooLargeError(ValueError):
+    pass
+
+
+def source_size(source):
+    return len(source) if isinstance(source, (bytes, bytearray)) else os.path.getsize(source)
+
+
+def _open_pymupdf(source):
+    if isinstance(source, (bytes, bytearray)):
+        return pymupdf.open(stream=bytes(source), filetype="pdf")
+    return pymupdf.open(source)
+
+
+def _open_pdfplumber(source):
+    return pdfplumber.open(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source)
+
+
+def pymupdf_page_count(source):
+    with _open_pymupdf(source) as pdf:
+        return pdf.page_count
+
+
+def pdfplumber_page_count(source):
+    with _open_pdfplumber(source) as pdf:
+        return len(pdf.pages)
+
+
+def pymupdf_pages(source, start=0, stop=MAX_PAGES):
+    with _open_pymupdf(source) as pdf:
+        for number in range(start, min(stop, pdf.page_count)):
+            yield pdf[number].get_text()
+
+
+def pdfplumber_pages(source, start=0, stop=MAX_PAGES):
+    with _open_pdfplumber(source) as pdf:
+        for page in pdf.pages[start:stop]:
+            yield page.extract_text() or ""
+
+
+# name -> (page text generator, page counter), in the order they are tried
+ENGINES = {
+    "pymupdf": (pymupdf_pages, pymupdf_page_count),
+    "pdfplumber": (pdfplumber_pages, pdfplumber_page_count),
+}
+
+
+def available_engines():
+    return [name for name in ENGINES if name != "pymupdf" or pymupdf is not None]
+
+
+def _page_range_text(args):
+    engine, source, start, stop = args
+    return list(ENGINES[engine][0](source, start, stop))
+
+
+def engine_pages(engine, source, max_pages=MAX_PAGES, workers=None):
+    """Page texts from one engine; large documents are split into page ranges across the process pool."""
+    pages, page_count = ENGINES[engine]
+    if not workers or workers <= 1:
+        return pages(source, 0, max_pages)
+    total = min(page_count(source), max_pages)
+    if total < PARALLEL_MIN_PAGES:
+        return pages(source, 0, total)
+    from ingest import get_pool
+    step = -(-total // workers)
+    ranges = [(engine, source, start, min(start + step, total)) for start in range(0, total, step)]
+    return (text for texts in get_pool().map(_page_range_text, ranges) for text in texts)
+
+
+def extract_text(source, engines=None, max_pages=MAX_PAGES, max_bytes=MAX_BYTES, workers=None):
+    """Text of the first max_pages pages from the first engine that finds any.
+
+    Raises PDFTooLargeError for sources over max_bytes.
+    """
+    with span("pdf_extract"):
+        return _extract_text(source, engines, max_pages, max_bytes, workers)
+
+
+def _extract_text(source, engines, max_pages, max_bytes, workers):
+    size = source_size(source)
+    if max_bytes and size > max_bytes:
+        raise PDFTooLargeError(f"PDF is {size} bytes, the limit is {max_bytes}")
+    for engine in engines or available_engines():
+        try:
+            text = PAGE_SEPARATOR.join(page for page in engine_pages(engine, source, max_pages, workers) if page)
+        except Exception as e:
+            print(f"⚠ {engine} could not read the PDF:", e)
+            continue
+        if text.strip():
+            return text.strip()
+    return ""
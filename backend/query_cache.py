@@ -0,0 +1,79 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_query(text):
+    """Job description text with case and whitespace differences removed."""
+    return " ".join(str(text).lower().split())
+
+
+def query_key(text):
+    return hashlib.sha1(normalize_query(text).encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe LRU cache whose entries also expire ttl seconds after they were stored."""
+
+    def __init__(self, max_entries=256, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, loader):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        value = loader()
+        with self.lock:
+            self.entries[key] = (now, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def get_many(self, keys, loader):
+        """Values for many keys; loader gets the list of missing keys and returns their values in order."""
+        now = time.monotonic()
+        values, missing = {}, []
+        with self.lock:
+            for key in keys:
+                entry = self.entries.get(key)
+                if entry is not None and now - entry[0] < self.ttl:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    values[key] = entry[1]
+                elif key not in missing:
+                    self.misses += 1
+                    missing.append(key)
+        if missing:
+            loaded = loader(missing)
+            with self.lock:
+                for key, value in zip(missing, loaded):
+                    values[key] = value
+                    self.entries[key] = (now, value)
+                    self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+        return [values[key] for key in keys]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self.entries)}
@@ -158,124 +158,427 @@ if __name__ == "__main__":
 '''
 
 import os
-import re
-import pdfplumber
-import csv
-import spacy
-import pandas as pd
-from flask import Flask, request, jsonify
+import time
+import zipfile
+import zlib
+import json
+import threading
+import numpy as np
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-from sentence_transformers import SentenceTransformer, util
-
+from embedding_store import EMBEDDING_FIELDS, EmbeddingStore, encode_rows
+from chunking import encode_texts
+from scoring import top_k_indices
+from ann_index import IVFIndex
+from bm25_index import BM25_FIELDS, BM25Index
+from candidate_filters import FilterIndex, facets, parse_filters
+from candidate_store import CANDIDATE_COLUMNS, CandidateStore
+from candidate_cache import CandidateCache, file_signature
+from query_cache import LRUCache, normalize_query, query_key
+from resume_parser import allowed_file, extract_text_from_pdf, extract_resume_details
+from ingest import parse_many, source_sha256
+from pdf_text import MAX_BYTES
+from upload_store import UploadStore, read_upload
+from job_queue import JobQueue
+from model_registry import ModelRegistry
+from saved_searches import SavedSearches
+import metrics
+from metrics import span
+
+START_TIME = time.perf_counter()
 app = Flask(__name__)
 CORS(app)
+metrics.instrument(app)
+# Werkzeug rejects larger requests with 413 before reading the body.
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get("MAX_UPLOAD_MB", 64)) * 1024 * 1024
 
-UPLOAD_FOLDER = 'uploads'
 CSV_FILE = "database/candidates.csv"
-ALLOWED_EXTENSIONS = {'pdf'}
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+SCORE_WEIGHTS = {"Skills": 0.4, "Experience": 0.25, "Certifications": 0.15, "FullText": 0.2}
+FIELD_WEIGHTS = [SCORE_WEIGHTS[field] for field in EMBEDDING_FIELDS]
+RESULT_COLUMNS = ["Name", "Email", "Phone", "Skills", "Experience", "Certifications"]
+DETAIL_COLUMNS = [column for column in CANDIDATE_COLUMNS if column != "FullText"]
+NEAR_DUPLICATE_SIMILARITY = 0.9
+QUERY_CACHE_TTL = 3600
+HYBRID_SHORTLIST = 200
+RETRIEVAL_MODES = ("semantic", "hybrid")
+MATCH_BATCH_TOP_K = 10
+STREAM_FETCH_ROWS = 500
+CACHED_RESULT_ROWS = 500
+SAVED_SEARCH_TOP_K = 50
+MAX_SAVED_SEARCH_TOP_K = 1000
+MAX_BATCH_JOBS = 200
+# Limits on what one batch upload's archives may expand to.
+MAX_ZIP_ENTRIES = int(os.environ.get("MAX_ZIP_ENTRIES", 1000))
+MAX_ZIP_BYTES = int(os.environ.get("MAX_ZIP_MB", 512)) * 1024 * 1024
 os.makedirs("database", exist_ok=True)
 
-nlp = spacy.load("en_core_web_md")
-bert_model = SentenceTransformer('all-MiniLM-L6-v2')
-
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
-
-def extract_text_from_pdf(pdf_path):
-    text = ""
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                extracted_text = page.extract_text()
-                if extracted_text:
-                    text += extracted_text + " \n"
-    except Exception as e:
-        print("❌ Error extracting text:", e)
-    return text.strip()
-
-def extract_resume_details(text):
-    details = {
-        "Name": "Not Found",
-        "Email": "Not Found",
-        "Phone": "Not Found",
-        "Education": "Not Found",
-        "Experience": "Not Found",
-        "Skills": "Not Found",
-        "Certifications": "Not Found",
-        "FullText": text.replace("\n", " ")
+def load_bert_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer('all-MiniLM-L6-v2')
+
+models = ModelRegistry()
+models.register("bert", load_bert_model)
+candidate_store = CandidateStore()
+candidate_cache = CandidateCache()
+job_cache = LRUCache(max_entries=512, ttl=QUERY_CACHE_TTL)
+result_cache = LRUCache(max_entries=256, ttl=QUERY_CACHE_TTL)
+candidate_store.import_csv(CSV_FILE)
+embedding_store = EmbeddingStore()
+ann_index = IVFIndex()
+bm25_index = BM25Index()
+filter_index = FilterIndex()
+sync_lock = threading.Lock()
+job_queue = JobQueue()
+upload_store = UploadStore()
+saved_searches = SavedSearches()
+metrics.add_cache_collectors({"candidates": candidate_cache, "job_descriptions": job_cache, "results": result_cache})
+metrics.add_model_collector(models)
+
+def bert_model():
+    return models.get("bert")
+
+def save_candidate(data):
+    return candidate_store.append(data)
+
+def candidate_similarity(stacked, field_vectors):
+    """Weighted cosine between stored (fields, dim) embeddings and one row of encode_rows output."""
+    new_vectors = np.stack([field_vectors[field][0] for field in EMBEDDING_FIELDS])
+    return float(np.dot(FIELD_WEIGHTS, np.sum(stacked * new_vectors, axis=1)))
+
+def same_contact(row, other):
+    return any(row[key] == other[key] and row[key] not in ("", "Not Found") for key in ("Email", "Phone"))
+
+def find_near_duplicate(resume_data, field_vectors):
+    """Id of a stored candidate with the same email or phone and near-identical field embeddings."""
+    best_id, best_similarity = None, NEAR_DUPLICATE_SIMILARITY
+    for candidate_id in candidate_store.find_by_contact(resume_data["Email"], resume_data["Phone"]):
+        if candidate_id >= len(embedding_store):
+            continue
+        similarity = candidate_similarity(embedding_store.stacked[:, candidate_id], field_vectors)
+        if similarity >= best_similarity:
+            best_id, best_similarity = candidate_id, similarity
+    return best_id
+
+def update_candidate(candidate_id, resume_data, field_vectors):
+    """Replace a stored candidate with its re-submitted resume; call under sync_lock."""
+    candidate_store.update(candidate_id, resume_data)
+    bm25_index.update(candidate_id, resume_data)
+    filter_index.update(candidate_id, facets(resume_data))
+    embedding_store.update(candidate_id, field_vectors)
+    ann_index.update(candidate_id, combined_vectors(embedding_store.stacked[:, candidate_id]))
+    offer_to_saved_searches([candidate_id], [facets(resume_data)])
+
+def process_upload(data, sha256, filename):
+    resume_text = extract_text_from_pdf(data)
+    resume_data = extract_resume_details(resume_text)
+    field_vectors = encode_rows(bert_model(), [resume_data])
+    sync_embeddings()
+    with sync_lock:
+        candidate_id = find_near_duplicate(resume_data, field_vectors)
+        if candidate_id is not None:
+            update_candidate(candidate_id, resume_data, field_vectors)
+            message = "Existing candidate updated!"
+        else:
+            candidate_id = save_candidate(resume_data)
+            if len(embedding_store) == candidate_id:
+                embedding_store.append(field_vectors)
+                ann_index.add(combined_vectors(embedding_store.stacked[:, candidate_id]))
+                offer_to_saved_searches([candidate_id], [facets(resume_data)])
+            if len(bm25_index) == candidate_id:
+                bm25_index.add([resume_data])
+            if len(filter_index) == candidate_id:
+                filter_index.add([facets(resume_data)])
+            message = "Resume uploaded successfully!"
+        candidate_store.record_hashes([(sha256, candidate_id, filename)])
+    result_cache.clear()
+    return {"message": message, "candidate_id": candidate_id}
+
+def ingest_resumes(items, workers=None):
+    """Parse (name, path or bytes) items in parallel, embed them in one batch and store them in one write.
+
+    PDFs whose exact bytes were ingested before are skipped without parsing.
+    A resume matching a stored candidate, or an earlier resume of the same
+    batch, by contact and near-identical embeddings updates it instead of
+    adding a row, as a single upload does.
+    """
+    fresh, duplicates, seen = [], [], set()
+    for name, source in items:
+        sha256 = source_sha256(source)
+        if sha256 in seen or candidate_store.find_hash(sha256) is not None:
+            duplicates.append(name)
+        else:
+            seen.add(sha256)
+            fresh.append((name, source, sha256))
+            if isinstance(source, bytes):
+                upload_store.persist(sha256, source)
+
+    # Parsing runs in worker processes, so its stages are timed as one span here.
+    with span("parse_batch"):
+        parsed = parse_many([(name, source) for name, source, _ in fresh], workers)
+    stored = [(details, sha256, name) for (name, details), (_, _, sha256) in zip(parsed, fresh) if details]
+    field_vectors = encode_rows(bert_model(), [details for details, _, _ in stored]) if stored else {}
+    sync_embeddings()
+    new_rows, hashes, updated = [], [], []  # new_rows: (details, vectors, [(sha256, name)])
+    with sync_lock:
+        for i, (details, sha256, name) in enumerate(stored):
+            vectors = {field: field_vectors[field][i:i + 1] for field in EMBEDDING_FIELDS}
+            candidate_id = find_near_duplicate(details, vectors)
+            if candidate_id is not None:
+                update_candidate(candidate_id, details, vectors)
+                hashes.append((sha256, candidate_id, name))
+                updated.append(name)
+                continue
+            earlier = next((slot for slot, (row, row_vectors, _) in enumerate(new_rows) if same_contact(row, details) and
+                            candidate_similarity(np.stack([row_vectors[field][0] for field in EMBEDDING_FIELDS]),
+                                                 vectors) >= NEAR_DUPLICATE_SIMILARITY), None)
+            if earlier is None:
+                new_rows.append((details, vectors, [(sha256, name)]))
+            else:
+                # The later copy in the batch wins, as it would have if uploaded second.
+                new_rows[earlier] = (details, vectors, new_rows[earlier][2] + [(sha256, name)])
+                updated.append(name)
+        ids = candidate_store.append_many(details for details, _, _ in new_rows)
+        hashes += [(sha256, candidate_id, name)
+                   for (_, _, files), candidate_id in zip(new_rows, ids) for sha256, name in files]
+        # Vectors already encoded for the dedup check are stored as-is; sync fills in the other indexes.
+        if ids and len(embedding_store) == ids[0]:
+            embedding_store.append({field: np.concatenate([vectors[field] for _, vectors, _ in new_rows])
+                                    for field in EMBEDDING_FIELDS})
+            offer_to_saved_searches(ids, [facets(details) for details, _, _ in new_rows])
+        candidate_store.record_hashes(hashes)
+    sync_embeddings()
+    result_cache.clear()
+    return {
+        "ingested": len(new_rows),
+        "updated": updated,
+        "duplicates": duplicates,
+        "failed": [name for name, details in parsed if details is None]
     }
-    
-    lines = text.split("\n")
-    details["Name"] = lines[0].strip() if len(lines) > 0 else "Not Found"
-    
-    email_match = re.search(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", text)
-    if email_match:
-        details["Email"] = email_match.group()
-    
-    phone_match = re.search(r"\b\d{10}\b", text)
-    if phone_match:
-        details["Phone"] = phone_match.group()
-    
-    education_keywords = ["Bachelor", "Master", "B.Tech", "M.Tech", "BSc", "MSc", "PhD", "university", "college"]
-    details["Education"] = " | ".join([line for line in lines if any(word in line for word in education_keywords)])
-    
-    experience_keywords = ["experience", "worked at", "internship", "years", "projects"]
-    details["Experience"] = " | ".join([line for line in lines if any(word.lower() in line.lower() and len(line.split()) > 3 for word in experience_keywords)])
-    
-    skills_keywords = ["Python", "Java", "SQL", "HTML", "CSS", "Cloud Computing", "Machine Learning", "Deep Learning", "C++", "Verilog", "Xilinx", "Digital Circuit Design", "Analog Circuit Design"]
-    details["Skills"] = ", ".join(set([word for word in skills_keywords if word in text]))
-    
-    cert_keywords = ["certification", "certified", "course", "diploma", "Udemy", "NPTEL", "WIPRO"]
-    details["Certifications"] = " | ".join([line for line in lines if any(word.lower() in line.lower() for word in cert_keywords)])
-    
-    return details
-
-def save_to_csv(data):
-    df = pd.DataFrame([data])
-    if not os.path.exists(CSV_FILE) or os.stat(CSV_FILE).st_size == 0:
-        df.to_csv(CSV_FILE, index=False, encoding='utf-8')
-    else:
-        df.to_csv(CSV_FILE, mode='a', header=False, index=False, encoding='utf-8')
 
 def bert_match(job_description, resume_text):
-    job_embedding = bert_model.encode(job_description, convert_to_tensor=True)
-    resume_embedding = bert_model.encode(resume_text, convert_to_tensor=True)
-    similarity_score = util.pytorch_cos_sim(job_embedding, resume_embedding).item()
-    return similarity_score
+    job_embedding, resume_embedding = encode_texts(bert_model(), [job_description, resume_text])
+    return float(np.dot(job_embedding, resume_embedding))
+
+def combined_vectors(stacked):
+    """Collapse stacked field embeddings into one vector whose dot product is the weighted score."""
+    return np.tensordot(FIELD_WEIGHTS, stacked, axes=1)
+
+def sync_embeddings():
+    """Bring the embeddings and ANN index up to date with the candidate store."""
+    return candidate_cache.get("embeddings", candidate_store.files(), _sync_embeddings)
+
+def _sync_embeddings():
+    with sync_lock:
+        embedding_store.refresh()
+        ann_index.refresh()
+        # Read before the new rows, so an update racing this sync is applied now or next time.
+        updated, update_seq = candidate_store.updated_since(min(bm25_index.update_seq, filter_index.update_seq))
+        if len(embedding_store) > candidate_store.count():
+            print("⚠ Embedding store out of sync with candidates! Rebuilding...")
+            embedding_store.reset()
+        if len(ann_index) > len(embedding_store):
+            ann_index.reset()
+        start = len(embedding_store)
+        missing = candidate_store.read(EMBEDDING_FIELDS, start=start)
+        if not missing.empty:
+            embedding_store.append(encode_rows(bert_model(), missing.to_dict("records")))
+            offer_to_saved_searches(np.arange(start, len(embedding_store)),
+                                    candidate_store.read_facets(start=start).to_dict("records"))
+        if len(ann_index) < len(embedding_store):
+            ann_index.add(combined_vectors(embedding_store.stacked[:, len(ann_index):]))
+        if len(bm25_index) > len(embedding_store):
+            bm25_index.reset()
+        # Rows another worker updated in place; rows appended below are read with their latest text.
+        stale = [candidate_id for candidate_id in updated if candidate_id < len(bm25_index)]
+        for candidate_id, row in zip(stale, candidate_store.fetch(stale, BM25_FIELDS)):
+            bm25_index.update(candidate_id, row)
+        bm25_index.update_seq = update_seq
+        if len(bm25_index) < len(embedding_store):
+            bm25_index.add(candidate_store.read(BM25_FIELDS, start=len(bm25_index)).to_dict("records"))
+        if len(filter_index) > len(embedding_store):
+            filter_index.reset()
+        stale = [candidate_id for candidate_id in updated if candidate_id < len(filter_index)]
+        for candidate_id, row in zip(stale, candidate_store.fetch_facets(stale)):
+            filter_index.update(candidate_id, row)
+        filter_index.update_seq = update_seq
+        if len(filter_index) < len(embedding_store):
+            filter_index.add(candidate_store.read_facets(start=len(filter_index)).to_dict("records"))
+        return len(embedding_store)
+
+def offer_to_saved_searches(candidate_ids, row_facets):
+    """Score only these new or changed candidates against the saved searches, re-ranking any that need it."""
+    saved_searches.refresh()
+    if len(saved_searches) == 0:
+        return
+    vectors = combined_vectors(embedding_store.stacked[:, np.asarray(candidate_ids)])
+    for search_id in saved_searches.offer(candidate_ids, vectors, row_facets):
+        search = saved_searches.get(search_id)
+        ids, scores = saved_ranking(job_embedding_for(search["job_description"]), search["top_k"], search["filters"])
+        saved_searches.replace(search_id, ids, scores)
+
+def saved_ranking(job_embedding, top_k, filters):
+    """Full exact ranking used when a saved search is created or has to be rebuilt."""
+    mask = filter_index.mask(filters, len(embedding_store))
+    return exact_search(job_embedding, top_k, None if mask is None else np.flatnonzero(mask))
+
+def job_embedding_for(job_description):
+    """Embedding of the normalised job description, reused across requests."""
+    text = normalize_query(job_description)
+    return job_cache.get(query_key(text), lambda: encode_texts(bert_model(), [text])[0])
+
+def job_embeddings_for(job_descriptions):
+    """(jobs, dim) embeddings; descriptions missing from the cache are encoded in one batched call."""
+    keys = [query_key(text) for text in job_descriptions]
+    texts = dict(zip(keys, (normalize_query(text) for text in job_descriptions)))
+    return np.stack(job_cache.get_many(keys, lambda missing: encode_texts(bert_model(), [texts[key] for key in missing])))
+
+def store_version():
+    """Changes whenever an upload from any worker changes the candidates or their embeddings."""
+    return file_signature(candidate_store.files() + [embedding_store.path])
+
+def exact_search(job_embedding, k=None, ids=None):
+    """(ids, scores) by the weighted embedding score over every row, or only over ids."""
+    metrics.inc("candidates_scored_total", len(embedding_store) if ids is None else len(ids), ranker="exact")
+    return embedding_store.search(FIELD_WEIGHTS, job_embedding, k, ids)
+
+def hybrid_search(job_description, job_embedding, k=None, mask=None):
+    """Re-rank a BM25 shortlist by the weighted embedding score; cost grows with the shortlist, not the pool."""
+    shortlist, _ = bm25_index.search(job_description, max(HYBRID_SHORTLIST, 4 * (k or 0)))
+    shortlist = shortlist[shortlist < len(embedding_store)]
+    if mask is not None:
+        shortlist = shortlist[mask[shortlist]]
+    if len(shortlist) == 0:
+        return ann_index.search(job_embedding, k) if mask is None else exact_search(job_embedding, k, np.flatnonzero(mask))
+    return exact_search(job_embedding, k, shortlist)
+
+def result_key(job_description, top_k, offset, min_score, retrieval, filters):
+    return (query_key(job_description), store_version(), top_k, offset, min_score, retrieval,
+            json.dumps(filters, sort_keys=True))
+
+def rank_resumes(job_description, top_k=None, offset=0, min_score=None, retrieval="semantic", filters=None):
+    """Result dicts best first.
+
+    Results of up to CACHED_RESULT_ROWS rows are cached whole so a repeated
+    query never goes back to the store; longer ones cache only their ids and
+    scores, keeping every result_cache entry small.
+    """
+    order, scores = ranked_ids(job_description, top_k, offset, min_score, retrieval, filters)
+    if len(order) > CACHED_RESULT_ROWS:
+        return list(iter_candidates(order, scores))
+    key = ("candidates",) + result_key(job_description, top_k, offset, min_score, retrieval, filters)
+    return result_cache.get(key, lambda: list(iter_candidates(order, scores)))
+
+def ranked_ids(job_description, top_k=None, offset=0, min_score=None, retrieval="semantic", filters=None):
+    """(ids, scores) best first; streamed results cache only these, dicts are built as they are sent."""
+    sync_embeddings()
+    key = ("ids",) + result_key(job_description, top_k, offset, min_score, retrieval, filters)
+    return result_cache.get(key, lambda: _ranked_ids(job_description, top_k, offset, min_score, retrieval, filters))
+
+def _ranked_ids(job_description, top_k, offset, min_score, retrieval, filters):
+    if len(embedding_store) == 0:
+        return np.arange(0), np.zeros(0, dtype=np.float32)
+
+    job_embedding = job_embedding_for(job_description)
+    k = None if top_k is None else offset + top_k
+    # Filters are a cheap columnar pass; only the rows that survive it are scored.
+    with span("filter"):
+        mask = filter_index.mask(filters, len(embedding_store))
+    with span("score"):
+        if retrieval == "hybrid":
+            order, scores = hybrid_search(job_description, job_embedding, k, mask)
+        elif mask is not None:
+            order, scores = exact_search(job_embedding, k, np.flatnonzero(mask))
+        elif top_k is None:
+            order, scores = exact_search(job_embedding)
+        else:
+            order, scores = ann_index.search(job_embedding, k)
+    order, scores = order[offset:], scores[offset:]
+    if min_score is not None:
+        keep = scores >= min_score
+        order, scores = order[keep], scores[keep]
+    return order, scores
+
+def iter_candidates(order, scores, fetch_rows=STREAM_FETCH_ROWS):
+    """Result dicts in rank order, reading candidate rows from the store a chunk at a time."""
+    for start in range(0, len(order), fetch_rows):
+        rows = candidate_store.fetch(order[start:start + fetch_rows], RESULT_COLUMNS)
+        for score, row in zip(scores[start:start + fetch_rows], rows):
+            yield candidate_result(row, score)
+
+def ndjson_lines(candidates, page_size=None):
+    """One JSON line per candidate, or per page of page_size candidates."""
+    if not page_size:
+        for candidate in candidates:
+            yield json.dumps(candidate) + "\n"
+        return
+    page = []
+    for candidate in candidates:
+        page.append(candidate)
+        if len(page) == page_size:
+            yield json.dumps({"candidates": page}) + "\n"
+            page = []
+    if page:
+        yield json.dumps({"candidates": page}) + "\n"
+
+def candidate_result(row, score):
+    skills_text = str(row.get("Skills", ""))
+    experience_text = str(row.get("Experience", ""))
+    certifications_text = str(row.get("Certifications", ""))
+
+    matched_info = {
+        "Technical Skills": skills_text.split(", "),
+        "Certifications": certifications_text.split(" | "),
+        "Projects": experience_text.split(" | ")
+    }
 
-def rank_resumes(job_description):
-    if not os.path.exists(CSV_FILE) or os.stat(CSV_FILE).st_size == 0:
-        return []
-    
-    df = pd.read_csv(CSV_FILE, encoding='utf-8')
-    ranked_candidates = []
-    for _, row in df.iterrows():
-        skills_text = str(row.get("Skills", ""))
-        experience_text = str(row.get("Experience", ""))
-        certifications_text = str(row.get("Certifications", ""))
-        full_text = str(row.get("FullText", ""))
-        
-        score = 0.5 * bert_match(job_description, skills_text) + \
-                0.3 * bert_match(job_description, experience_text) + \
-                0.2 * bert_match(job_description, certifications_text)
-        
-        matched_info = {
-            "Technical Skills": skills_text.split(", "),
-            "Certifications": certifications_text.split(" | "),
-            "Projects": experience_text.split(" | ")
-        }
-        
-        ranked_candidates.append({
-            "name": row["Name"],
-            "email": row["Email"],
-            "phone": row["Phone"],
-            "score": round(score, 2),
-            "matched_info": matched_info
-        })
-    
-    ranked_candidates.sort(key=lambda x: x["score"], reverse=True)
-    return ranked_candidates
+    return {
+        "name": row["Name"],
+        "email": row["Email"],
+        "phone": row["Phone"],
+        "score": round(float(score), 2),
+        "matched_info": matched_info
+    }
+
+def match_many(job_descriptions, top_k=MATCH_BATCH_TOP_K, min_score=None, filters=None):
+    """Top candidates for each job description, scored together as one (candidates x jobs) product."""
+    sync_embeddings()
+    if len(embedding_store) == 0:
+        return [[] for _ in job_descriptions]
+
+    job_embeddings = job_embeddings_for(job_descriptions)
+    with span("filter"):
+        mask = filter_index.mask(filters, len(embedding_store))
+    ids = None if mask is None else np.flatnonzero(mask)
+    with span("score_batch"):
+        results = embedding_store.search_many(FIELD_WEIGHTS, job_embeddings, top_k, ids)
+    scored = len(embedding_store) if ids is None else len(ids)
+    metrics.inc("candidates_scored_total", scored * len(job_descriptions), ranker="batch")
+    if min_score is not None:
+        results = [(order[scores >= min_score], scores[scores >= min_score]) for order, scores in results]
+
+    # Candidates shared by several jobs are read from the store once.
+    unique_ids = np.unique(np.concatenate([order for order, _ in results]))
+    rows = dict(zip(unique_ids.tolist(), candidate_store.fetch(unique_ids, RESULT_COLUMNS)))
+    return [[candidate_result(rows[i], score) for i, score in zip(order.tolist(), scores)]
+            for order, scores in results]
+
+def best_roles(candidate_id, job_descriptions, top_k=None):
+    """Job descriptions ranked by how well one stored candidate fits them."""
+    job_embeddings = job_embeddings_for(job_descriptions)
+    scores = job_embeddings @ combined_vectors(embedding_store.stacked[:, candidate_id])
+    return [{"job_index": int(i), "job_description": job_descriptions[i], "score": round(float(scores[i]), 2)}
+            for i in top_k_indices(scores, top_k)]
+
+def parse_job_descriptions(data):
+    """Validated job_descriptions list of a batch request; raises ValueError on bad input."""
+    job_descriptions = data.get("job_descriptions")
+    if not isinstance(job_descriptions, list) or not job_descriptions:
+        raise ValueError("job_descriptions must be a non-empty list")
+    if len(job_descriptions) > MAX_BATCH_JOBS:
+        raise ValueError(f"At most {MAX_BATCH_JOBS} job descriptions per request")
+    if not all(isinstance(text, str) and text.strip() for text in job_descriptions):
+        raise ValueError("Every job description must be non-empty text")
+    return job_descriptions
 
 @app.route('/upload', methods=['POST'])
 def upload_resume():
@@ -287,24 +590,243 @@ def upload_resume():
         return jsonify({"error": "No selected file"}), 400
 
     if file and allowed_file(file.filename):
-        filename = os.path.join(UPLOAD_FOLDER, file.filename)
-        file.save(filename)
-        resume_text = extract_text_from_pdf(filename)
-        resume_data = extract_resume_details(resume_text)
-        save_to_csv(resume_data)
-        return jsonify({"message": "Resume uploaded successfully!"}), 200
+        sha256, data = read_upload(file.stream)
+        if len(data) > MAX_BYTES:
+            return jsonify({"error": f"File larger than {MAX_BYTES // (1024 * 1024)} MB"}), 413
+        candidate_id = candidate_store.find_hash(sha256)
+        if candidate_id is not None:
+            details = candidate_store.fetch([candidate_id], DETAIL_COLUMNS)
+            return jsonify({
+                "message": "Resume already uploaded!",
+                "candidate_id": candidate_id,
+                "details": details[0] if details else None
+            }), 200
+        upload_store.persist(sha256, data)
+        job_id = job_queue.submit("upload", process_upload, data, sha256, file.filename)
+        return jsonify({"message": "Resume queued for processing!", "job_id": job_id}), 202
     else:
         return jsonify({"error": "Invalid file type"}), 400
 
+@app.route('/upload/batch', methods=['POST'])
+def upload_batch():
+    files = request.files.getlist('files') + request.files.getlist('file')
+    if not files:
+        return jsonify({"error": "No file part"}), 400
+
+    items, too_large = [], []
+    for file in files:
+        if file.filename.lower().endswith('.zip'):
+            try:
+                zipped, skipped = zip_items(file.stream, MAX_ZIP_ENTRIES - len(items),
+                                            MAX_ZIP_BYTES - sum(len(data) for _, data in items))
+            except ValueError as e:
+                return jsonify({"error": f"{file.filename}: {e}"}), 400
+            items += zipped
+            too_large += skipped
+        elif allowed_file(file.filename):
+            data = file.stream.read()
+            if len(data) > MAX_BYTES:
+                too_large.append(file.filename)
+            else:
+                items.append((file.filename, data))
+    if not items:
+        return jsonify({"error": "No PDF files found", "too_large": too_large}), 400
+
+    job_id = job_queue.submit("batch", ingest_batch, items)
+    return jsonify({
+        "message": f"{len(items)} resumes queued for processing!",
+        "job_id": job_id,
+        "too_large": too_large
+    }), 202
+
+def zip_items(stream, max_entries=MAX_ZIP_ENTRIES, max_total=MAX_ZIP_BYTES):
+    """(name, bytes) of the PDFs in an archive, and the names of those over MAX_BYTES.
+
+    Raises ValueError for an unreadable archive, more than max_entries PDFs,
+    or PDFs inflating to more than max_total bytes. Entry sizes are read
+    from the archive itself, so the bytes actually inflated are counted too.
+    """
+    items, too_large, total = [], [], 0
+    try:
+        with zipfile.ZipFile(stream) as archive:
+            entries = [entry for entry in archive.infolist()
+                       if not entry.is_dir() and allowed_file(os.path.basename(entry.filename))]
+            if len(entries) > max_entries:
+                raise ValueError(f"more than {MAX_ZIP_ENTRIES} PDFs in one upload")
+            for entry in entries:
+                name = os.path.basename(entry.filename)
+                if entry.file_size > MAX_BYTES:
+                    too_large.append(name)
+                    continue
+                with archive.open(entry) as pdf:
+                    data = pdf.read(MAX_BYTES + 1)
+                if len(data) > MAX_BYTES:
+                    too_large.append(name)
+                    continue
+                total += len(data)
+                if total > max_total:
+                    raise ValueError(f"PDFs expand to more than {MAX_ZIP_BYTES // (1024 * 1024)} MB")
+                items.append((name, data))
+    except (zipfile.BadZipFile, zlib.error, EOFError, RuntimeError, NotImplementedError) as e:
+        raise ValueError(f"not a readable zip archive ({e})")
+    return items, too_large
+
+def ingest_batch(items):
+    start = time.perf_counter()
+    summary = ingest_resumes(items)
+    elapsed = time.perf_counter() - start
+    return {
+        "message": "Resumes uploaded successfully!",
+        **summary,
+        "seconds": round(elapsed, 2),
+        "resumes_per_sec": round(len(items) / elapsed, 1) if elapsed else None
+    }
+
+@app.errorhandler(413)
+def upload_too_large(e):
+    return jsonify({"error": f"Upload larger than {app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)} MB"}), 413
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job), 200
+
 @app.route('/match', methods=['POST'])
 def match_resumes():
     data = request.get_json()
     job_description = data.get("job_description", "")
     if not job_description:
         return jsonify({"error": "Job description is required"}), 400
-    ranked_candidates = rank_resumes(job_description)
+    try:
+        top_k = int(data["top_k"]) if data.get("top_k") is not None else None
+        offset = int(data.get("offset") or 0)
+        min_score = float(data["min_score"]) if data.get("min_score") is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "top_k and offset must be integers, min_score a number"}), 400
+    if (top_k is not None and top_k < 0) or offset < 0:
+        return jsonify({"error": "top_k and offset must not be negative"}), 400
+    retrieval = data.get("retrieval", "semantic")
+    if retrieval not in RETRIEVAL_MODES:
+        return jsonify({"error": f"retrieval must be one of {', '.join(RETRIEVAL_MODES)}"}), 400
+    try:
+        filters = parse_filters(data.get("filters"))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid filters: {e}"}), 400
+    if data.get("stream"):
+        # Opt-in NDJSON: rows are fetched and serialised as the client reads them.
+        try:
+            page_size = int(data.get("page_size") or 0)
+        except (TypeError, ValueError):
+            return jsonify({"error": "page_size must be an integer"}), 400
+        order, scores = ranked_ids(job_description, top_k, offset, min_score, retrieval, filters)
+        return Response(ndjson_lines(iter_candidates(order, scores), page_size), mimetype="application/x-ndjson")
+    ranked_candidates = rank_resumes(job_description, top_k, offset, min_score, retrieval, filters)
     return jsonify({"candidates": ranked_candidates})
 
+@app.route('/match/batch', methods=['POST'])
+def match_batch():
+    data = request.get_json() or {}
+    try:
+        job_descriptions = parse_job_descriptions(data)
+        top_k = int(data["top_k"]) if data.get("top_k") is not None else MATCH_BATCH_TOP_K
+        min_score = float(data["min_score"]) if data.get("min_score") is not None else None
+        filters = parse_filters(data.get("filters"))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    if top_k <= 0:
+        return jsonify({"error": "top_k must be positive"}), 400
+    results = match_many(job_descriptions, top_k, min_score, filters)
+    return jsonify({"results": [{"job_description": text, "candidates": candidates}
+                                for text, candidates in zip(job_descriptions, results)]}), 200
+
+@app.route('/match/roles', methods=['POST'])
+def match_roles():
+    data = request.get_json() or {}
+    try:
+        job_descriptions = parse_job_descriptions(data)
+        top_k = int(data["top_k"]) if data.get("top_k") is not None else None
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    sync_embeddings()
+    candidate_id = data.get("candidate_id")
+    if candidate_id is None and data.get("email"):
+        ids = candidate_store.find_by_contact(data["email"], None)
+        candidate_id = ids[0] if ids else None
+    if not isinstance(candidate_id, int) or not 0 <= candidate_id < len(embedding_store):
+        return jsonify({"error": "Unknown candidate"}), 404
+    return jsonify({"candidate_id": candidate_id,
+                    "roles": best_roles(candidate_id, job_descriptions, top_k)}), 200
+
+@app.route('/searches', methods=['POST'])
+def create_search():
+    data = request.get_json() or {}
+    job_description = data.get("job_description", "")
+    if not job_description:
+        return jsonify({"error": "Job description is required"}), 400
+    try:
+        top_k = int(data["top_k"]) if data.get("top_k") is not None else SAVED_SEARCH_TOP_K
+        filters = parse_filters(data.get("filters"))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    if not 0 < top_k <= MAX_SAVED_SEARCH_TOP_K:
+        return jsonify({"error": f"top_k must be between 1 and {MAX_SAVED_SEARCH_TOP_K}"}), 400
+    sync_embeddings()
+    job_embedding = job_embedding_for(job_description)
+    # Ranked and saved under the sync lock so no candidate ingested in between is missed.
+    with sync_lock:
+        ids, scores = saved_ranking(job_embedding, top_k, filters)
+        search_id = saved_searches.create(job_description, job_embedding, top_k, filters, ids, scores)
+    return jsonify(saved_searches.get(search_id)), 201
+
+@app.route('/searches', methods=['GET'])
+def list_searches():
+    saved_searches.refresh()
+    return jsonify({"searches": saved_searches.list()}), 200
+
+@app.route('/searches/<int:search_id>/results', methods=['GET'])
+def search_results(search_id):
+    sync_embeddings()
+    saved_searches.refresh()
+    search = saved_searches.get(search_id)
+    if search is None:
+        return jsonify({"error": "Unknown search"}), 404
+    ids, scores = saved_searches.results(search_id)
+    return jsonify({"search": search, "candidates": list(iter_candidates(ids, scores))}), 200
+
+@app.route('/searches/<int:search_id>', methods=['DELETE'])
+def delete_search(search_id):
+    if not saved_searches.delete(search_id):
+        return jsonify({"error": "Unknown search"}), 404
+    return jsonify({"message": "Search deleted!"}), 200
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify({
+        **candidate_cache.stats(),
+        "job_descriptions": job_cache.stats(),
+        "results": result_cache.stats()
+    }), 200
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return metrics.REGISTRY.render(), 200, {"Content-Type": metrics.CONTENT_TYPE}
+
+@app.route('/health', methods=['GET'])
+def health():
+    return jsonify({
+        "status": "ok",
+        "warm": models.is_warm,
+        "models": models.status(),
+        "startup_seconds": STARTUP_SECONDS,
+        "uptime_seconds": round(time.time() - models.created, 1)
+    }), 200
+
+# ✅ Load models before gunicorn forks its workers when PRELOAD_MODELS is set
+models.warm_if_preloading()
+STARTUP_SECONDS = round(time.perf_counter() - START_TIME, 2)
+
 if __name__ == "__main__":
     app.run(debug=True)
 
@@ -0,0 +1,79 @@
+import re
+from pdf_text import extract_text
+from keyword_matcher import KeywordMatcher, found_keywords, hit_lines
+from metrics import span
+
+ALLOWED_EXTENSIONS = {'pdf'}
+
+# Education and Skills match case-sensitively as they always have; Skills also
+# need whole words so that e.g. "Java" no longer matches "JavaScript".
+SECTION_MATCHER = KeywordMatcher({
+    "Education": {"keywords": ["Bachelor", "Master", "B.Tech", "M.Tech", "BSc", "MSc", "PhD", "university", "college"],
+                  "case_sensitive": True},
+    "Experience": {"keywords": ["experience", "worked at", "internship", "years", "projects"]},
+    "Skills": {"keywords": ["Python", "Java", "SQL", "HTML", "CSS", "Cloud Computing", "Machine Learning", "Deep Learning",
+                            "C++", "Verilog", "Xilinx", "Digital Circuit Design", "Analog Circuit Design"],
+               "case_sensitive": True, "whole_words": True},
+    "Certifications": {"keywords": ["certification", "certified", "course", "diploma", "Udemy", "NPTEL", "WIPRO"]},
+})
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def extract_text_from_pdf(source):
+    """Text of a PDF given as a path or as bytes."""
+    try:
+        return extract_text(source)
+    except Exception as e:
+        print("❌ Error extracting text:", e)
+        return ""
+
+def extract_resume_details(text):
+    with span("extract_details"):
+        return _extract_resume_details(text)
+
+def _extract_resume_details(text):
+    details = {
+        "Name": "Not Found",
+        "Email": "Not Found",
+        "Phone": "Not Found",
+        "Education": "Not Found",
+        "Experience": "Not Found",
+        "Skills": "Not Found",
+        "Certifications": "Not Found",
+        "FullText": text.replace("\n", " ")
+    }
+    
+    lines = text.split("\n")
+    details["Name"] = lines[0].strip() if len(lines) > 0 else "Not Found"
+    
+    email_match = re.search(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", text)
+    if email_match:
+        details["Email"] = email_match.group()
+    
+    phone_match = re.search(r"\b\d{10}\b", text)
+    if phone_match:
+        details["Phone"] = phone_match.group()
+    
+    details.update(extract_sections(text))
+    
+    return details
+
+def parse_resume(item):
+    """Extract details from one (name, path or bytes) item; details is None when the PDF has no text."""
+    name, source = item
+    text = extract_text_from_pdf(source)
+    return name, extract_resume_details(text) if text else None
+
+def extract_sections(text):
+    """Education, Experience, Skills and Certifications fields from one scan of the text."""
+    lines = text.split("\n")
+    with span("extract_sections"):
+        hits = SECTION_MATCHER.scan(text)
+        line_hits = hit_lines(lines, hits)
+    return {
+        "Education": " | ".join(lines[i] for i in line_hits["Education"]),
+        "Experience": " | ".join(lines[i] for i in line_hits["Experience"] if len(lines[i].split()) > 3),
+        "Skills": ", ".join(found_keywords(hits)["Skills"]),
+        "Certifications": " | ".join(lines[i] for i in line_hits["Certifications"])
+    }
@@ -0,0 +1,222 @@
+import heapq
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+from candidate_filters import matches
+
+SEARCHES_DB_FILE = "database/saved_searches.db"
+
+
+class SavedSearches:
+    """Saved job searches, each with a live top-k of candidates.
+
+    A search keeps a min-heap of (score, candidate id) no larger than its
+    top_k, so a new candidate is scored once against every saved query and
+    only replaces a search's worst entry when it beats it. Searches, their
+    query embeddings and heaps are kept in a SQLite file of their own.
+
+    Every write bumps the database's user_version. Writes run in a BEGIN
+    IMMEDIATE transaction that first reloads this worker's copy if another
+    worker has bumped it, so no worker overwrites heaps it has not seen;
+    refresh() does the same check for readers.
+    """
+
+    def __init__(self, path=SEARCHES_DB_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.version = None
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS saved_searches (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                         "job_description TEXT, top_k INTEGER, filters TEXT, embedding BLOB, created REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS saved_search_results (search_id INTEGER, candidate_id INTEGER, "
+                         "score REAL, PRIMARY KEY (search_id, candidate_id))")
+        self.load()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction holding the database lock from the reload until commit."""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            with self.lock:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if _version(conn) != self.version:
+                        self._load(conn)
+                    yield conn
+                    changed = conn.total_changes > 0
+                    if changed:
+                        conn.execute(f"PRAGMA user_version = {self.version + 1}")
+                    conn.execute("COMMIT")
+                    if changed:
+                        self.version += 1
+                except BaseException:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                    self.version = None  # the copy may hold the rolled-back change
+                    raise
+        finally:
+            conn.close()
+
+    def __len__(self):
+        return len(self.searches)
+
+    def load(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            with self.lock:
+                # One snapshot for the searches, their heaps and the version.
+                conn.execute("BEGIN")
+                self._load(conn)
+                conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def _load(self, conn):
+        searches = conn.execute("SELECT id, job_description, top_k, filters, embedding, created "
+                                "FROM saved_searches ORDER BY id").fetchall()
+        results = conn.execute("SELECT search_id, candidate_id, score FROM saved_search_results").fetchall()
+        self.searches = {}
+        for search_id, job_description, top_k, filters, embedding, created in searches:
+            self.searches[search_id] = {
+                "id": search_id, "job_description": job_description, "top_k": top_k,
+                "filters": json.loads(filters) if filters else None,
+                "embedding": np.frombuffer(embedding, dtype=np.float32), "created": created, "heap": []
+            }
+        for search_id, candidate_id, score in results:
+            if search_id in self.searches:
+                self.searches[search_id]["heap"].append((score, candidate_id))
+        for search in self.searches.values():
+            heapq.heapify(search["heap"])
+        self.version = _version(conn)
+
+    def refresh(self):
+        """Reload if another process has changed the saved searches since we last read or wrote them."""
+        with self._connect() as conn:
+            version = _version(conn)
+        if version != self.version:
+            self.load()
+
+    def _save_heaps(self, conn, searches):
+        for search in searches:
+            conn.execute("DELETE FROM saved_search_results WHERE search_id = ?", (search["id"],))
+            conn.executemany("INSERT INTO saved_search_results (search_id, candidate_id, score) VALUES (?, ?, ?)",
+                             [(search["id"], int(candidate_id), float(score)) for score, candidate_id in search["heap"]])
+
+    def create(self, job_description, embedding, top_k, filters, ids, scores):
+        """Save a search together with its initial ranking (ids, scores) and return its id."""
+        embedding = np.asarray(embedding, dtype=np.float32)
+        created = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute("INSERT INTO saved_searches (job_description, top_k, filters, embedding, created) "
+                                  "VALUES (?, ?, ?, ?, ?)", (job_description, int(top_k),
+                                                             json.dumps(filters) if filters else None,
+                                                             embedding.tobytes(), created))
+            search = {"id": cursor.lastrowid, "job_description": job_description, "top_k": int(top_k),
+                      "filters": filters, "embedding": embedding, "created": created,
+                      "heap": [(float(score), int(candidate_id)) for candidate_id, score in zip(ids, scores)][:top_k]}
+            heapq.heapify(search["heap"])
+            self._save_heaps(conn, [search])
+            self.searches[search["id"]] = search
+        return search["id"]
+
+    def replace(self, search_id, ids, scores):
+        """Swap in a freshly computed ranking, e.g. after a ranked candidate's score dropped."""
+        with self._transaction() as conn:
+            search = self.searches.get(search_id)
+            if search is None:
+                return
+            search["heap"] = [(float(score), int(candidate_id)) for candidate_id, score in zip(ids, scores)][:search["top_k"]]
+            heapq.heapify(search["heap"])
+            self._save_heaps(conn, [search])
+
+    def delete(self, search_id):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM saved_searches WHERE id = ?", (search_id,))
+            conn.execute("DELETE FROM saved_search_results WHERE search_id = ?", (search_id,))
+            found = self.searches.pop(search_id, None) is not None
+        return found
+
+    def get(self, search_id):
+        """Search details without the embedding and heap, or None."""
+        search = self.searches.get(search_id)
+        if search is None:
+            return None
+        return {key: search[key] for key in ("id", "job_description", "top_k", "filters", "created")}
+
+    def list(self):
+        return [self.get(search_id) for search_id in list(self.searches)]
+
+    def results(self, search_id):
+        """(ids, scores) of a search's current top k, best first."""
+        with self.lock:
+            ranked = sorted(self.searches[search_id]["heap"], key=lambda entry: (-entry[0], entry[1]))
+        return (np.array([candidate_id for _, candidate_id in ranked], dtype=np.int64),
+                np.array([score for score, _ in ranked], dtype=np.float32))
+
+    def offer(self, candidate_ids, vectors, row_facets):
+        """Score new or updated candidates against every saved search and push them into the heaps.
+
+        vectors are the candidates' combined embeddings, row_facets their
+        facet rows. A candidate already in a heap is rescored in place.
+        Returns the ids of searches where such a candidate lost score while
+        the heap was full: someone outside the heap may now belong in it, so
+        those searches need a full re-rank.
+        """
+        if not self.searches or len(candidate_ids) == 0:
+            return []
+        candidate_ids = np.asarray(candidate_ids, dtype=np.int64)
+        offered = set(candidate_ids.tolist())
+        # The heaps are read, updated and saved under one write lock, so concurrent offers all land.
+        with self._transaction() as conn:
+            searches = list(self.searches.values())
+            if not searches:
+                return []
+            scores = np.asarray(vectors, dtype=np.float32) @ np.stack([search["embedding"] for search in searches]).T
+            changed, stale = [], []
+            for column, search in zip(scores.T, searches):
+                heap = search["heap"]
+                was_full = len(heap) >= search["top_k"]
+                previous = {candidate_id: score for score, candidate_id in heap if candidate_id in offered}
+                if previous:
+                    heap[:] = [entry for entry in heap if entry[1] not in previous]
+                    heapq.heapify(heap)
+                    changed.append(search)
+                # Only rows beating the current worst entry can enter a full heap.
+                floor = heap[0][0] if len(heap) >= search["top_k"] else -np.inf
+                pushed = False
+                for i in np.flatnonzero(column > floor):
+                    if not matches(search["filters"], row_facets[i]):
+                        continue
+                    entry = (float(column[i]), int(candidate_ids[i]))
+                    if len(heap) < search["top_k"]:
+                        heapq.heappush(heap, entry)
+                    elif entry > heap[0]:
+                        heapq.heapreplace(heap, entry)
+                    else:
+                        continue
+                    pushed = True
+                if pushed and search not in changed:
+                    changed.append(search)
+                if previous and was_full:
+                    current = {candidate_id: score for score, candidate_id in heap if candidate_id in previous}
+                    if any(current.get(candidate_id, -np.inf) < score for candidate_id, score in previous.items()):
+                        stale.append(search["id"])
+            self._save_heaps(conn, changed)
+        return stale
+
+
+def _version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
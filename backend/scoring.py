@@ -0,0 +1,89 @@
+import re
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+class KeywordIndex:
+    """Sparse token-presence matrices over the text columns of every candidate.
+
+    Scores keep the rankers' substring semantics: a keyword without
+    whitespace occurs in a field exactly when it occurs inside one of the
+    field's whitespace-separated tokens, so each keyword is resolved to the
+    vocabulary terms containing it and the whole pool is scored with one
+    sparse product per field.
+    """
+
+    def __init__(self, columns):
+        self.columns = {field: pd.Series(texts, dtype=object).reset_index(drop=True)
+                        for field, texts in columns.items()}
+        self.size = len(next(iter(self.columns.values()))) if self.columns else 0
+
+        tokens = {field: texts.str.split().explode().dropna() for field, texts in self.columns.items()}
+        all_tokens = pd.concat(list(tokens.values())) if tokens else pd.Series([], dtype=object)
+        codes, vocab = pd.factorize(all_tokens)
+        self.vocab = list(vocab)
+        self._vocab_text = "\n".join(self.vocab)
+        self._vocab_starts = np.cumsum([0] + [len(term) + 1 for term in self.vocab])[:-1]
+
+        self.matrices = {}
+        offset = 0
+        for field, field_tokens in tokens.items():
+            field_codes = codes[offset:offset + len(field_tokens)]
+            offset += len(field_tokens)
+            self.matrices[field] = sparse.csr_matrix(
+                (np.ones(len(field_codes), dtype=np.int32), (field_tokens.index.to_numpy(dtype=np.int64), field_codes)),
+                shape=(self.size, len(self.vocab)))
+
+    def _terms_containing(self, keyword):
+        """Vocabulary indices of every term that has keyword as a substring."""
+        positions = [m.start() for m in re.finditer(re.escape(keyword), self._vocab_text)]
+        return np.unique(np.searchsorted(self._vocab_starts, positions, side="right") - 1)
+
+    def scores(self, keywords, rows=None):
+        """Number of (keyword, field) hits per candidate, or only per candidate in rows; repeated keywords count repeatedly."""
+        total = np.zeros(self.size if rows is None else len(rows), dtype=np.int64)
+        if not keywords or len(total) == 0:
+            return total
+
+        counts = pd.Series(keywords).value_counts()
+        token_keywords = [kw for kw in counts.index if kw and not any(ch.isspace() for ch in kw)]
+        phrase_keywords = [kw for kw in counts.index if kw and kw not in token_keywords]
+
+        if token_keywords:
+            term_ids, keyword_ids = [], []
+            for j, keyword in enumerate(token_keywords):
+                terms = self._terms_containing(keyword)
+                term_ids.extend(terms)
+                keyword_ids.extend([j] * len(terms))
+            keyword_terms = sparse.csr_matrix((np.ones(len(term_ids), dtype=np.int32), (term_ids, keyword_ids)),
+                                              shape=(len(self.vocab), len(token_keywords)))
+            weights = counts[token_keywords].to_numpy()
+            for matrix in self.matrices.values():
+                matrix = matrix if rows is None else matrix[rows]
+                total += (matrix @ keyword_terms > 0).astype(np.int64) @ weights
+
+        for keyword in phrase_keywords:
+            for texts in self.columns.values():
+                texts = texts if rows is None else texts.iloc[rows]
+                total += texts.str.contains(keyword, regex=False).to_numpy(dtype=np.int64) * counts[keyword]
+
+        return total
+
+
+def weighted_similarity(stacked, weights, query):
+    """Weighted cosine over stacked (fields, rows, dim) normalised embeddings."""
+    return np.asarray(weights, dtype=stacked.dtype) @ (stacked @ query)
+
+
+def top_k_indices(scores, k=None):
+    """Indices of the k best scores, best first; ties keep their original order."""
+    scores = np.asarray(scores)
+    n = len(scores)
+    if k is None or k >= n:
+        candidates = np.arange(n)
+    elif k <= 0:
+        return np.arange(0)
+    else:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
@@ -0,0 +1,46 @@
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+UPLOAD_FOLDER = 'uploads'
+PERSIST_ENV = "PERSIST_UPLOADS"
+
+
+class UploadStore:
+    """Content-addressed copies of uploaded PDFs, written off the request path.
+
+    Uploads are parsed from memory; keeping the original is optional and
+    happens on a background thread as uploads/<sha256>.pdf, so the same
+    file uploaded twice is stored once.
+    """
+
+    def __init__(self, folder=UPLOAD_FOLDER, enabled=None):
+        self.folder = folder
+        self.enabled = os.environ.get(PERSIST_ENV, "1").lower() not in ("0", "false", "no") if enabled is None else enabled
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persist-upload")
+        os.makedirs(folder, exist_ok=True)
+
+    def path(self, sha256):
+        return os.path.join(self.folder, sha256 + ".pdf")
+
+    def persist(self, sha256, data):
+        if self.enabled:
+            return self.executor.submit(self._write, sha256, data)
+        return None
+
+    def _write(self, sha256, data):
+        path = self.path(sha256)
+        if os.path.exists(path):
+            return path
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix=".part")
+        with os.fdopen(fd, 'wb') as out:
+            out.write(data)
+        os.replace(tmp_path, path)
+        return path
+
+
+def read_upload(stream):
+    """(sha256, bytes) of an uploaded file, read straight from Werkzeug's in-memory or spooled stream."""
+    data = stream.read()
+    return hashlib.sha256(data).hexdigest(), data
@@ -0,0 +1,71 @@
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class GroupCommitWriter:
+    """One writer thread per process that commits concurrent writes in batches.
+
+    Callers queue an item and wait on its future. Everything queued while the
+    previous batch was being committed goes into the next call of
+    commit(items), so N concurrent uploads cost one transaction and one fsync
+    instead of N. commit returns one result per item; an exception instance
+    in place of a result fails only that item's future.
+
+    The thread is started on first use in each process, so a writer created
+    before gunicorn forks still works in every worker.
+    """
+
+    def __init__(self, commit, max_batch=256, name="group-commit"):
+        self.commit = commit
+        self.max_batch = max_batch
+        self.name = name
+        self.lock = threading.Lock()
+        self.pid = None
+        self.batches = 0
+        self.items = 0
+
+    def _ensure_thread(self):
+        with self.lock:
+            if self.pid != os.getpid():
+                self.queue = queue.Queue()
+                threading.Thread(target=self._run, args=(self.queue,), name=self.name, daemon=True).start()
+                self.pid = os.getpid()
+
+    def submit(self, item):
+        self._ensure_thread()
+        future = Future()
+        self.queue.put((item, future))
+        return future
+
+    def write(self, item):
+        """Queue one item and block until its batch is committed."""
+        return self.submit(item).result()
+
+    def write_many(self, items):
+        futures = [self.submit(item) for item in items]
+        return [future.result() for future in futures]
+
+    def _run(self, pending):
+        while True:
+            batch = [pending.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                results = self.commit([item for item, _ in batch])
+            except Exception as e:
+                results = [e] * len(batch)
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), result in zip(batch, results):
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def stats(self):
+        return {"batches": self.batches, "writes": self.items}
@@ -108,43 +108,3 @@ document.getElementById('upload-form').addEventListener('submit', function(event
         document.getElementById('upload-message').innerText = "Upload failed!";
     });
 });
-
-// Handle job description input and ranking resumes
-function matchResumes() {
-    let jobDescription = document.getElementById("job-description").value;
-
-    if (!jobDescription) {
-        alert("Please enter a job description!");
-        return;
-    }
-
-    fetch("http://127.0.0.1:5000/match", {
-        method: "POST",
-        headers: {
-            "Content-Type": "application/json"
-        },
-        body: JSON.stringify({ "job_description": jobDescription })
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.candidates) {
-            displayResults(data.candidates);
-        } else {
-            document.getElementById("results").innerText = "No matching candidates found.";
-        }
-    })
-    .catch(error => console.error("Error:", error));
-}
-
-function displayResults(candidates) {
-    let resultsDiv = document.getElementById("results");
-    resultsDiv.innerHTML = ""; // Clear previous results
-
-    candidates.forEach(candidate => {
-        let candidateDiv = document.createElement("div");
-        candidateDiv.innerHTML = `<strong>${candidate.Name}</strong> - ${candidate.Email} - ${candidate.Phone} <br> 
-                                  Skills: ${candidate.Skills} <br> 
-                                  <strong>Match Score:</strong> ${Math.round(candidate["Match Score"] * 100)}% <hr>`;
-        resultsDiv.appendChild(candidateDiv);
-    });
-}